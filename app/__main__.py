@@ -0,0 +1,186 @@
+"""Serving and maintenance commands.
+
+    python -m app serve --workers 4
+    python -m app calibrate-hashing --scheme argon2 --target-ms 250
+    python -m app recount-comments --batch-size 1000
+    python -m app recompute-ratings --batch-size 1000
+"""
+import argparse
+import asyncio
+import inspect
+import os
+import sys
+from importlib.util import find_spec
+
+
+def default_workers() -> int:
+    """One worker per CPU the process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def serve(args: argparse.Namespace) -> None:
+    """Production server: no reloader, uvloop and httptools when present.
+
+    On SIGTERM or SIGINT uvicorn stops accepting connections and lets
+    in-flight requests finish for up to --graceful-shutdown seconds
+    before the lifespan shutdown flushes buffers and closes the pools.
+    Without TOKEN_STORAGE_URL issued tokens live in process memory, so
+    one worker is started unless --workers says otherwise.
+    """
+    import uvicorn
+
+    from app.core.config import settings
+
+    workers = args.workers
+    if workers is None:
+        # Tokens issued by one worker are unknown to the others
+        # unless they share the token storage.
+        workers = default_workers() if settings.token_storage_url else 1
+    elif workers > 1 and not settings.token_storage_url:
+        print('Warning: without TOKEN_STORAGE_URL tokens are only '
+              'accepted by the worker that issued them', file=sys.stderr)
+
+    uvicorn.run(
+        'app.main:app',
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop='uvloop' if find_spec('uvloop') else 'asyncio',
+        http='httptools' if find_spec('httptools') else 'h11',
+        backlog=args.backlog,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_shutdown,
+        access_log=args.access_log,
+        lifespan='on',
+    )
+
+
+def calibrate_hashing(args: argparse.Namespace) -> None:
+    """Pick the highest cost whose verify time stays within the target"""
+    from app.core.security import COST_PARAMETERS, calibrate_cost
+
+    parameter, candidates = COST_PARAMETERS[args.scheme]
+    costs = {}
+    if args.scheme == 'argon2':
+        costs = {
+            'argon2_memory_cost_kib': args.memory_cost_kib,
+            'argon2_parallelism': args.parallelism,
+        }
+    target = args.target_ms / 1000
+    chosen = None
+    for cost, seconds in calibrate_cost(args.scheme, target, args.samples,
+                                        **costs):
+        print(f"{parameter}={cost}: {seconds * 1000:.1f} ms")
+        if seconds <= target:
+            chosen = cost
+
+    if chosen is None:
+        hint = (' or lower --memory-cost-kib and --parallelism'
+                if args.scheme == 'argon2' else '')
+        sys.exit(f"\nNo {parameter} stays within {args.target_ms:g} ms "
+                 f"per verify, raise --target-ms{hint}")
+    print(f"\nHighest cost within {args.target_ms:g} ms per verify:")
+    print(f"{parameter.upper()}={chosen}")
+    for name, value in costs.items():
+        print(f"{name.upper()}={value}")
+
+
+async def repair_users(repair, description: str, batch_size: int) -> None:
+    from app.core.db import async_engine, async_session_factory
+
+    try:
+        async with async_session_factory() as session:
+            fixed = await repair(session, batch_size)
+    finally:
+        await async_engine.dispose()
+    print(f"{description} fixed for {fixed} user(s)")
+
+
+async def recount_comments(args: argparse.Namespace) -> None:
+    from app.crud.user import recount_comment_counters
+
+    await repair_users(
+        recount_comment_counters, 'Comment counters', args.batch_size
+    )
+
+
+async def recompute_ratings(args: argparse.Namespace) -> None:
+    from app.crud.user import recompute_ratings
+
+    await repair_users(recompute_ratings, 'Ratings', args.batch_size)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m app', description=__doc__)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    from app.core.config import settings
+
+    server = commands.add_parser('serve', help='run the production server')
+    server.add_argument('--host', default=settings.server_host)
+    server.add_argument('--port', type=int, default=settings.server_port)
+    server.add_argument('--workers', type=int,
+                        default=settings.server_workers,
+                        help='worker processes; defaults to the CPU count '
+                             'when TOKEN_STORAGE_URL points at a shared '
+                             'Redis, and to 1 otherwise, since issued tokens '
+                             'are kept in the memory of the worker that '
+                             'issued them')
+    server.add_argument('--backlog', type=int,
+                        default=settings.server_backlog,
+                        help='pending connections queued by the socket')
+    server.add_argument('--keep-alive', type=int,
+                        default=settings.server_keep_alive_seconds,
+                        help='seconds an idle keep-alive connection is kept')
+    server.add_argument('--graceful-shutdown', type=int,
+                        default=settings.server_graceful_shutdown_seconds,
+                        help='seconds in-flight requests get on shutdown')
+    server.add_argument('--access-log', action=argparse.BooleanOptionalAction,
+                        default=True)
+    server.set_defaults(handler=serve)
+
+    calibrate = commands.add_parser(
+        'calibrate-hashing',
+        help='find password hashing costs for a verify time target',
+    )
+    calibrate.add_argument('--scheme', choices=('bcrypt', 'argon2'),
+                           default=settings.password_schemes[0])
+    calibrate.add_argument('--target-ms', type=float,
+                           default=settings.password_verify_target_ms,
+                           help='verify time to stay within')
+    calibrate.add_argument('--samples', type=int, default=5,
+                           help='verifications timed per cost')
+    calibrate.add_argument('--memory-cost-kib', type=int,
+                           default=settings.argon2_memory_cost_kib,
+                           help='argon2 memory per hash, kept fixed')
+    calibrate.add_argument('--parallelism', type=int,
+                           default=settings.argon2_parallelism,
+                           help='argon2 lanes per hash, kept fixed')
+    calibrate.set_defaults(handler=calibrate_hashing)
+
+    recount = commands.add_parser(
+        'recount-comments',
+        help='recompute written and received comment counters of users',
+    )
+    recount.add_argument('--batch-size', type=int, default=1000,
+                         help='users updated per transaction')
+    recount.set_defaults(handler=recount_comments)
+
+    ratings = commands.add_parser(
+        'recompute-ratings',
+        help='recompute ratings of users from the scores they received',
+    )
+    ratings.add_argument('--batch-size', type=int, default=1000,
+                         help='users updated per transaction')
+    ratings.set_defaults(handler=recompute_ratings)
+
+    args = parser.parse_args(argv)
+    result = args.handler(args)
+    if inspect.iscoroutine(result):
+        asyncio.run(result)
+
+
+if __name__ == '__main__':
+    main()
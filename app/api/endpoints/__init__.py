@@ -2,3 +2,4 @@
 from .user import router as user_router
 from .auth import router as auth_router
 from .comment import router as comment_router
+from .metrics import router as metrics_router
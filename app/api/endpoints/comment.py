@@ -1,22 +1,39 @@
-from typing import Annotated, List, TYPE_CHECKING
+from typing import Annotated, List, Literal, Optional, TYPE_CHECKING
 
 from fastapi import (
-    APIRouter, Depends, Form,
-    HTTPException, Path, status, Query
+    APIRouter, Body, Depends, Form,
+    HTTPException, Path, Request, status, Query
 )
+from fastapi.responses import StreamingResponse
 
 from app.api.endpoints.validators import (
-    check_comment_before_edit, check_user_exists
+    check_comment_before_edit, comment_access_error
 )
-from app.core.auth.dependencies import get_current_auth_user
-from app.core.db import get_async_session
+from app.core.auth.dependencies import (
+    get_current_auth_user, get_current_auth_writer
+)
+from app.core.conditional import (
+    PUBLIC_CACHE_CONTROL, conditional_json, has_preconditions,
+    is_not_modified, not_modified, strong_etag
+)
+from app.core.config import settings
+from app.core.db import (
+    get_async_session, get_read_session, read_session_factory
+)
+from app.core.responses import dump_json, model_response
+from app.core.search_cache import search_cache
+from app.core.singleflight import read_flights
 from app.crud.comment import (
-    create_comment, get_comment_by_user,
-    update_comment, delete_comment, search_comments_by_keyword
+    create_comment, create_comments_bulk, get_comment_by_user,
+    build_fts_query, get_comment_version, update_comment, delete_comment,
+    search_comments_by_keyword
 )
+from app.crud.user import get_existing_user_ids
 from app.schemas.auth import AuthUser
+from app.services.export import EXPORT_MEDIA_TYPES, export_comments
 from app.schemas.comment import (
-    CommentCreate, CommentDB, CommentUpdate, CommentResponse
+    CommentBulkResult, CommentCreate, CommentDB, CommentPage,
+    CommentUpdate, CommentResponse
 )
 if TYPE_CHECKING:
     from sqlalchemy.ext.asyncio import AsyncSession
@@ -24,6 +41,17 @@ if TYPE_CHECKING:
 
 router = APIRouter()
 
+PageLimit = Annotated[
+    int,
+    Query(ge=1,
+          le=settings.comments_max_page_size,
+          description="Maximum number of comments on the page")
+]
+PageCursor = Annotated[
+    Optional[str],
+    Query(description="next_cursor value of the previous page")
+]
+
 
 @router.post(
     '/',
@@ -32,34 +60,111 @@ router = APIRouter()
 )
 async def create_new_comment(
         comment: Annotated[CommentCreate, Form()],
-        author: Annotated[AuthUser, Depends(get_current_auth_user)],
+        author: Annotated[AuthUser, Depends(get_current_auth_writer)],
         session: Annotated["AsyncSession", Depends(get_async_session)],
 ):
     """For authorised users only"""
-    await check_user_exists(comment.user_id, session)
     new_comment = await create_comment(comment, author, session)
-    return new_comment
+    if new_comment is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail='UsersORM not found'
+        )
+    return model_response(CommentDB, new_comment)
+
+
+@router.post(
+    '/bulk',
+    response_model=CommentBulkResult,
+    summary="Bulk comment creation"
+)
+async def create_new_comments_bulk(
+        comments: Annotated[
+            List[CommentCreate],
+            Body(...,
+                 min_length=1,
+                 max_length=settings.comments_bulk_max_size,
+                 description="Comments to be created")
+        ],
+        author: Annotated[AuthUser, Depends(get_current_auth_writer)],
+        session: Annotated["AsyncSession", Depends(get_async_session)],
+):
+    """For authorised users only, unknown recipients are reported per item"""
+    existing_user_ids = await get_existing_user_ids(
+        (comment.user_id for comment in comments), session
+    )
+    items = await create_comments_bulk(
+        comments, author, existing_user_ids, session
+    )
+    return model_response(CommentBulkResult, {
+        'created': sum(item.id is not None for item in items),
+        'items': items,
+    })
 
 
 @router.get(
     '/my_comments',
-    response_model=List[CommentDB],
+    response_model=CommentPage,
     summary="All your comments receive"
 )
 async def get_my_comments(
+        request: Request,
         author: Annotated[AuthUser, Depends(get_current_auth_user)],
-        session: Annotated["AsyncSession", Depends(get_async_session)],
+        limit: PageLimit = settings.comments_page_size,
+        cursor: PageCursor = None,
 ):
     """For authorised users only"""
-    comments = await get_comment_by_user(
-        author=author, session=session
-    )
-    if not comments:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Comments are not found"
+    factory = read_session_factory(request)
+
+    async def load_page() -> bytes:
+        async with factory() as session:
+            comments, next_cursor = await get_comment_by_user(
+                author=author, session=session, limit=limit, cursor=cursor
+            )
+        if not comments and cursor is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Comments are not found"
+            )
+        return dump_json(
+            CommentPage, {'items': comments, 'next_cursor': next_cursor}
         )
-    return comments
+
+    # Every comment write bumps the version, so requests that arrive
+    # after the author's write do not join a flight started before it.
+    body = await read_flights.do(
+        ('my_comments', factory, search_cache.version,
+         author.id, limit, cursor),
+        load_page
+    )
+    return conditional_json(request, body)
+
+
+@router.get(
+    '/export',
+    response_class=StreamingResponse,
+    summary="Export all your written and received comments"
+)
+async def export_my_comments(
+        request: Request,
+        author: Annotated[AuthUser, Depends(get_current_auth_user)],
+        export_format: Annotated[
+            Literal['ndjson', 'csv'],
+            Query(alias='format',
+                  description="ndjson or csv")
+        ] = 'ndjson',
+):
+    """For authorised users only"""
+    return StreamingResponse(
+        export_comments(
+            author.id, export_format, read_session_factory(request)
+        ),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            'Content-Disposition':
+                f'attachment; filename="comments.{export_format}"'
+        },
+    )
 
 
 @router.get(
@@ -74,19 +179,32 @@ async def get_comment(
                  title="Comments id",
                  description="Comments id to be returned")
         ],
+        request: Request,
         author: Annotated[AuthUser, Depends(get_current_auth_user)],
-        session: Annotated["AsyncSession", Depends(get_async_session)],
+        session: Annotated["AsyncSession", Depends(get_read_session)],
 ):
-    """For comment author only"""
+    """For comment author only, supports If-None-Match/If-Modified-Since"""
+    if has_preconditions(request):
+        updated_at = await get_comment_version(comment_id, author, session)
+        if updated_at is None:
+            raise await comment_access_error(comment_id, session)
+        etag = strong_etag(comment_id, updated_at)
+        if is_not_modified(request, etag, updated_at):
+            return not_modified(etag, updated_at)
     comment = await check_comment_before_edit(
         comment_id, author, session
     )
-    return comment
+    return conditional_json(
+        request,
+        dump_json(CommentResponse, comment),
+        strong_etag(comment.id, comment.updated_at),
+        comment.updated_at,
+    )
 
 
 @router.get(
     '/search/',
-    response_model=List[CommentDB],
+    response_model=CommentPage,
     summary="Receive comments by substring"
 )
 async def search_comments(
@@ -96,11 +214,37 @@ async def search_comments(
                   description="Keyword for searching"
                   )
         ],
-        session: Annotated["AsyncSession", Depends(get_async_session)],
+        request: Request,
+        limit: PageLimit = settings.comments_page_size,
+        cursor: PageCursor = None,
 ):
     """For all users"""
-    comments = await search_comments_by_keyword(keyword, session)
-    return comments
+    # FTS5 matching is case-insensitive, so is the cache key.
+    key = (build_fts_query(keyword).lower(), limit, cursor)
+    factory = read_session_factory(request)
+    # Captured before the lookup, so the flight joined and the body
+    # stored are never older than the last write this request follows.
+    version = search_cache.version
+
+    async def load_page() -> bytes:
+        async with factory() as session:
+            comments, next_cursor = await search_comments_by_keyword(
+                keyword, session, limit, cursor
+            )
+        body = dump_json(
+            CommentPage, {'items': comments, 'next_cursor': next_cursor}
+        )
+        search_cache.set(key, body, version)
+        return body
+
+    body = search_cache.get(key)
+    if body is None:
+        body = await read_flights.do(
+            ('search', factory, version, *key), load_page
+        )
+    return conditional_json(
+        request, body, cache_control=PUBLIC_CACHE_CONTROL
+    )
 
 
 @router.patch(
@@ -117,17 +261,16 @@ async def partially_update_comment(
                  )
         ],
         obj_in: Annotated[CommentUpdate, Form()],
-        author: Annotated[AuthUser, Depends(get_current_auth_user)],
+        author: Annotated[AuthUser, Depends(get_current_auth_writer)],
         session: Annotated["AsyncSession", Depends(get_async_session)],
 ):
     """For comment author only"""
-    comment = await check_comment_before_edit(
-        comment_id, author, session
-    )
     comment = await update_comment(
-        comment, obj_in, session
+        comment_id, obj_in, author, session
     )
-    return comment
+    if comment is None:
+        raise await comment_access_error(comment_id, session)
+    return model_response(CommentResponse, comment)
 
 
 @router.delete(
@@ -143,14 +286,13 @@ async def remove_comment(
                  description="Comment id, to be removed"
                  )
         ],
-        author: Annotated[AuthUser, Depends(get_current_auth_user)],
+        author: Annotated[AuthUser, Depends(get_current_auth_writer)],
         session: Annotated["AsyncSession", Depends(get_async_session)],
 ):
     """For comment author only"""
-    comment = await check_comment_before_edit(
-        comment_id, author, session
-    )
     comment = await delete_comment(
-        comment, session
+        comment_id, author, session
     )
-    return comment
+    if comment is None:
+        raise await comment_access_error(comment_id, session)
+    return model_response(CommentDB, comment)
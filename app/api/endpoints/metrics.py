@@ -0,0 +1,122 @@
+from typing import Iterable
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.core.auth.cache import token_cache, user_cache
+from app.core.metrics import CONTENT_TYPE, Counter, Gauge, Metric, registry
+from app.core.search_cache import search_cache
+from app.core.security import hashing_pool
+from app.core.singleflight import read_flights
+from app.core.throttle import client_limiter, username_limiter
+from app.services.last_login import last_login_buffer
+
+router = APIRouter()
+
+
+@registry.collector
+def password_hashing_metrics() -> Iterable[Metric]:
+    stats = hashing_pool.metrics
+    yield Counter(
+        'password_hashing_completed_total', 'Finished hash computations'
+    ).set_total(stats.completed)
+    yield Counter(
+        'password_hashing_failed_total', 'Hash computations that raised'
+    ).set_total(stats.failed)
+    yield Counter(
+        'password_hashing_rejected_total', 'Hash requests rejected with 503'
+    ).set_total(stats.rejected)
+    yield Counter(
+        'password_hashing_seconds_total', 'Time spent hashing passwords'
+    ).set_total(stats.total_seconds)
+    yield Gauge(
+        'password_hashing_pending', 'Hash computations queued or running'
+    ).set((), stats.pending)
+
+
+@registry.collector
+def cache_metrics() -> Iterable[Metric]:
+    caches = {
+        'user': user_cache, 'token': token_cache, 'search': search_cache
+    }
+    size = Gauge('cache_entries', 'Entries held by the cache', ('cache',))
+    hit_ratio = Gauge(
+        'cache_hit_ratio', 'Share of lookups served from the cache',
+        ('cache',)
+    )
+    lookups = Counter(
+        'cache_lookups_total', 'Cache lookups by result', ('cache', 'result')
+    )
+    evictions = Counter(
+        'cache_evictions_total', 'Entries pushed out by the LRU bound',
+        ('cache',)
+    )
+    for name, cache in caches.items():
+        stats = cache.stats
+        size.set((name,), stats['size'])
+        lookups.inc((name, 'hit'), stats['hits'])
+        lookups.inc((name, 'miss'), stats['misses'])
+        evictions.inc((name,), stats['evictions'])
+        lookups_total = stats['hits'] + stats['misses']
+        hit_ratio.set(
+            (name,), stats['hits'] / lookups_total if lookups_total else 0.0
+        )
+    yield from (size, hit_ratio, lookups, evictions)
+    yield Gauge(
+        'search_cache_bytes', 'Size of the cached search result bodies'
+    ).set((), search_cache.bytes)
+    yield Counter(
+        'search_cache_invalidations_total',
+        'Comment writes that invalidated the search cache'
+    ).set_total(search_cache.version)
+
+
+@registry.collector
+def singleflight_metrics() -> Iterable[Metric]:
+    stats = read_flights.stats
+    yield Gauge(
+        'singleflight_in_flight', 'Coalesced reads currently running'
+    ).set((), stats['in_flight'])
+    calls = Counter(
+        'singleflight_calls_total', 'Coalesced read calls by outcome',
+        ('result',)
+    )
+    for result in ('started', 'coalesced', 'overflows', 'timeouts'):
+        calls.inc((result,), stats[result])
+    yield calls
+
+
+@registry.collector
+def login_throttle_metrics() -> Iterable[Metric]:
+    limiters = {'username': username_limiter, 'client': client_limiter}
+    attempts = Counter(
+        'login_throttle_attempts_total', 'Login attempts by throttle result',
+        ('key', 'result')
+    )
+    buckets = Gauge(
+        'login_throttle_buckets', 'Token buckets being tracked', ('key',)
+    )
+    for name, limiter in limiters.items():
+        stats = limiter.stats
+        attempts.inc((name, 'allowed'), stats['allowed'])
+        attempts.inc((name, 'limited'), stats['limited'])
+        buckets.set((name,), stats['size'])
+    yield from (attempts, buckets)
+
+
+@registry.collector
+def last_login_metrics() -> Iterable[Metric]:
+    yield Gauge(
+        'last_login_pending', 'Login times waiting to be written'
+    ).set((), len(last_login_buffer.pending))
+    yield Counter(
+        'last_login_written_total', 'Login times written to the database'
+    ).set_total(last_login_buffer.flushed)
+    yield Counter(
+        'last_login_failed_flushes_total', 'Failed last login flushes'
+    ).set_total(last_login_buffer.failed_flushes)
+
+
+@router.get('/metrics', include_in_schema=False)
+async def metrics():
+    return Response(registry.render(), media_type=CONTENT_TYPE)
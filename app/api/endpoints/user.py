@@ -1,9 +1,11 @@
 from typing import Annotated, TYPE_CHECKING
 
-from fastapi import APIRouter, Depends, Form, Path
+from fastapi import APIRouter, Depends, Form, Path, Request
 
-from app.api.endpoints.validators import validate_user_before_create
-from app.core.auth.dependencies import get_current_auth_user
+from app.core.auth.dependencies import (
+    get_current_auth_user, get_current_auth_writer
+)
+from app.core.conditional import body_etag, conditional_json
 from app.core.db import get_async_session
 from app.crud.user import create_user, update_user
 from app.schemas.auth import AuthUser
@@ -24,7 +26,6 @@ async def create_new_user(
         user_in: Annotated[UserCreate, Form()],
         session: Annotated["AsyncSession", Depends(get_async_session)],
 ):
-    await validate_user_before_create(user_in, session)
     new_user = await create_user(user_in, session)
     return new_user
 
@@ -35,9 +36,11 @@ async def create_new_user(
             summary="Current user information receive",
             )
 async def read_user_me(
+        request: Request,
         current_user: Annotated[AuthUser, Depends(get_current_auth_user)]
 ):
-    return current_user
+    body = current_user.model_dump_json(exclude_none=True).encode()
+    return conditional_json(request, body, body_etag(body))
 
 
 @router.patch(
@@ -48,7 +51,7 @@ async def read_user_me(
 async def update_existed_user(
         user_id: Annotated[int, Path(description="user id")],
         user_update: Annotated[UserUpdate, Form()],
-        current_user: Annotated[AuthUser, Depends(get_current_auth_user)],
+        current_user: Annotated[AuthUser, Depends(get_current_auth_writer)],
         session: Annotated["AsyncSession", Depends(get_async_session)],
 ):
     result = await update_user(
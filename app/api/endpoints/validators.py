@@ -2,64 +2,48 @@ from typing import TYPE_CHECKING
 
 from fastapi import HTTPException, status
 
-from sqlalchemy import select, or_
+from sqlalchemy import select
 
 from app.crud.comment import get_comment_by_id
-from app.models import CommentsORM, UsersORM
+from app.models import CommentsORM
 from app.schemas.auth import AuthUser
-from app.schemas.user import UserCreate
 
 if TYPE_CHECKING:
     from sqlalchemy.ext.asyncio import AsyncSession
 
 
-async def check_comment_before_edit(
+async def comment_access_error(
         comment_id: int,
-        author: AuthUser,
         session: "AsyncSession",
-) -> CommentsORM:
-    comment = await get_comment_by_id(
-        comment_id, session
+) -> HTTPException:
+    """Tell a missing comment from someone else's one.
+
+    Only called after an ownership-filtered query found nothing,
+    so the happy path never pays for this lookup.
+    """
+    author_id = await session.scalar(
+        select(CommentsORM.author_id).where(CommentsORM.id == comment_id)
     )
-    if comment is None:
-        raise HTTPException(
+    if author_id is None:
+        return HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail='CommentsORM not found'
         )
-    if comment.author_id != author.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail='Not enough authority. You can edit your comments only'
-        )
-    return comment
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail='Not enough authority. You can edit your comments only'
+    )
 
 
-async def check_user_exists(
-        user_id: int,
+async def check_comment_before_edit(
+        comment_id: int,
+        author: AuthUser,
         session: "AsyncSession",
-):
-    db_user = await session.get(UsersORM, user_id)
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail='UsersORM not found'
-        )
-    return db_user
-
-
-async def validate_user_before_create(
-        user_in: UserCreate,
-        session: "AsyncSession"
-):
-    db_user = await session.execute(
-        select(UsersORM).where(
-            or_(UsersORM.email == user_in.email, UsersORM.username == user_in.username)
-        )
+) -> CommentsORM:
+    comment = await get_comment_by_id(
+        comment_id, author, session
     )
-    result = db_user.scalars().first()
-    if result:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail='UsersORM with these username or email already exists'
-        )
-    return result
+    if comment is None:
+        raise await comment_access_error(comment_id, session)
+    return comment
+
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends
 from fastapi.security import HTTPBearer
 
-from app.api.endpoints import auth_router, comment_router, user_router
+from app.api.endpoints import (
+    auth_router, comment_router, metrics_router, user_router
+)
 
 http_bearer = HTTPBearer(auto_error=False)
 
@@ -23,3 +25,5 @@ main_router.include_router(
     tags=['Auth'],
     dependencies=[Depends(http_bearer)]
 )
+
+main_router.include_router(metrics_router)
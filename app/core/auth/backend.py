@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 
-from fastapi_auth_jwt import JWTAuthBackend
+from fastapi_auth_jwt import JWTAuthBackend, RedisConfig
 
 from app.core.config import settings
 from app.schemas.auth import PayloadSchema
@@ -13,7 +13,13 @@ class AuthenticationSettings(BaseModel):
     expiration_seconds: int = settings.access_token_expiration_seconds
 
 
+# Issued tokens are kept in process memory unless a shared storage
+# is configured, so with several workers they must live in Redis.
 auth_backend = JWTAuthBackend(
     authentication_config=AuthenticationSettings(),
+    storage_config=(
+        RedisConfig(url=settings.token_storage_url)
+        if settings.token_storage_url else None
+    ),
     user_schema=PayloadSchema
 )
@@ -0,0 +1,25 @@
+from hashlib import sha256
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+user_cache = TTLCache(
+    maxsize=settings.user_cache_size,
+    ttl=settings.user_cache_ttl_seconds,
+)
+
+
+token_cache = TTLCache(
+    maxsize=settings.token_cache_size,
+    ttl=settings.token_cache_ttl_seconds,
+)
+
+
+def token_key(token: str) -> bytes:
+    """Cache key for a raw token, so tokens themselves are not kept around"""
+    return sha256(token.encode()).digest()
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop the cached projection of a user after it was changed"""
+    user_cache.pop(user_id)
@@ -1,16 +1,19 @@
+from time import time
 from typing import Annotated, TYPE_CHECKING
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials
 
+import jwt
 from jwt import InvalidTokenError
 
 from sqlalchemy import select
 
 from app.core.auth.backend import auth_backend
-from app.core.db import get_async_session
+from app.core.auth.cache import token_cache, token_key, user_cache
+from app.core.db import get_async_session, get_read_session
 from app.core.security import oauth2_scheme
-from app.schemas.auth import PayloadSchema
+from app.schemas.auth import AuthUser, PayloadSchema
 from app.models import UsersORM
 if TYPE_CHECKING:
     from sqlalchemy.ext.asyncio import AsyncSession
@@ -23,14 +26,30 @@ REFRESH_TOKEN_TYPE = 'refresh'
 async def get_current_payload(
         token: Annotated[HTTPAuthorizationCredentials, Depends(oauth2_scheme)]
 ) -> PayloadSchema:
+    # A cache hit skips the token store lookup of get_current_user, so a
+    # revoked or evicted token is still accepted until its entry expires;
+    # TOKEN_CACHE_TTL_SECONDS bounds that window.
+    key = token_key(token)
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
     try:
         payload = await auth_backend.get_current_user(token)
-        return payload
     except InvalidTokenError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid or expired token: {e}"
         )
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token"
+        )
+    # The signature is already verified above, only ``exp`` is read here.
+    claims = jwt.decode(token, options={"verify_signature": False})
+    if "exp" in claims:
+        token_cache.set(key, payload, ttl=claims["exp"] - time())
+    return payload
 
 
 async def validate_token_type(
@@ -49,17 +68,30 @@ async def validate_token_type(
 
 async def get_user_by_sub(
         payload: PayloadSchema,
-        session: Annotated["AsyncSession", Depends(get_async_session)],
-) -> UsersORM:
-    query = await session.execute(
-        select(UsersORM).where(UsersORM.id == payload.sub)
-    )
-    db_user = query.scalars().first()
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail='Token invalid'
+        session: "AsyncSession",
+) -> AuthUser:
+    user_id = int(payload.sub)
+    db_user = user_cache.get(user_id)
+    if db_user is None:
+        query = await session.execute(
+            select(
+                UsersORM.id,
+                UsersORM.username,
+                UsersORM.email,
+                UsersORM.rating,
+                UsersORM.comments_written,
+                UsersORM.comments_received,
+                UsersORM.is_active,
+            ).where(UsersORM.id == user_id)
         )
+        row = query.first()
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail='Token invalid'
+            )
+        db_user = AuthUser.model_validate(row)
+        user_cache.set(user_id, db_user)
     if not db_user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -68,11 +100,20 @@ async def get_user_by_sub(
     return db_user
 
 
-def get_auth_user_from_token_by_type(token_type: str):
+def get_auth_user_from_token_by_type(
+        token_type: str,
+        session_dependency=get_read_session,
+):
+    """Build the dependency that authenticates the request.
+
+    Write routes pass get_async_session: dependencies are cached per
+    request, so the user is looked up in the route's own primary
+    session instead of opening a replica session next to it.
+    """
     async def get_auth_user_from_token(
             payload: Annotated[PayloadSchema, Depends(get_current_payload)],
-            session: Annotated["AsyncSession", Depends(get_async_session)],
-    ) -> UsersORM:
+            session: Annotated["AsyncSession", Depends(session_dependency)],
+    ) -> AuthUser:
         await validate_token_type(payload, token_type)
         return await get_user_by_sub(payload, session)
 
@@ -80,4 +121,7 @@ def get_auth_user_from_token_by_type(token_type: str):
 
 
 get_current_auth_user = get_auth_user_from_token_by_type(ACCESS_TOKEN_TYPE)
+get_current_auth_writer = get_auth_user_from_token_by_type(
+    ACCESS_TOKEN_TYPE, get_async_session
+)
 get_current_auth_user_for_refresh = get_auth_user_from_token_by_type(REFRESH_TOKEN_TYPE)
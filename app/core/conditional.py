@@ -0,0 +1,109 @@
+from datetime import datetime, UTC
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import blake2b
+from typing import Optional
+
+from fastapi import Request, status
+from fastapi.responses import Response
+
+PRIVATE_CACHE_CONTROL = 'private, no-cache'
+PUBLIC_CACHE_CONTROL = 'no-cache'
+
+
+def strong_etag(*parts) -> str:
+    """ETag of a resource version, e.g. of its id and updated_at"""
+    digest = blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def body_etag(body: bytes, weak: bool = False) -> str:
+    digest = blake2b(body, digest_size=16).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def as_utc(value: datetime) -> datetime:
+    """SQLite hands back naive datetimes that were stored as UTC"""
+    return value.replace(tzinfo=UTC) if value.tzinfo is None else value
+
+
+def validator_headers(
+        etag: str,
+        last_modified: Optional[datetime] = None,
+        cache_control: str = PRIVATE_CACHE_CONTROL,
+) -> dict:
+    headers = {'ETag': etag, 'Cache-Control': cache_control}
+    if last_modified is not None:
+        headers['Last-Modified'] = format_datetime(
+            as_utc(last_modified), usegmt=True
+        )
+    return headers
+
+
+def has_preconditions(request: Request) -> bool:
+    return (
+        'if-none-match' in request.headers
+        or 'if-modified-since' in request.headers
+    )
+
+
+def is_not_modified(
+        request: Request,
+        etag: str,
+        last_modified: Optional[datetime] = None,
+) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when it is absent.
+
+    If-None-Match uses the weak comparison, so W/ prefixes are ignored.
+    """
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        if if_none_match.strip() == '*':
+            return True
+        current = etag.removeprefix('W/')
+        return any(
+            tag.strip().removeprefix('W/') == current
+            for tag in if_none_match.split(',')
+        )
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=UTC)
+    # HTTP dates have a one second resolution.
+    return as_utc(last_modified).replace(microsecond=0) <= since
+
+
+def not_modified(
+        etag: str,
+        last_modified: Optional[datetime] = None,
+        cache_control: str = PRIVATE_CACHE_CONTROL,
+) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=validator_headers(etag, last_modified, cache_control),
+    )
+
+
+def conditional_json(
+        request: Request,
+        body: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[datetime] = None,
+        cache_control: str = PRIVATE_CACHE_CONTROL,
+) -> Response:
+    """JSON response, or 304 when the client already holds this body.
+
+    Without an explicit ETag a weak one is derived from the body.
+    """
+    etag = etag or body_etag(body, weak=True)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified, cache_control)
+    return Response(
+        body,
+        media_type='application/json',
+        headers=validator_headers(etag, last_modified, cache_control),
+    )
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 env_path = Path(__file__).parent.parent.parent / ".env"
@@ -8,9 +9,64 @@ class Settings(BaseSettings):
     app_title: str = 'Comments service application'
     description: str = 'Service description'
     database_url: str
+    database_read_url: Optional[str] = None
+    db_echo: bool = False
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 60 * 30
+    db_pool_pre_ping: Optional[bool] = None
+    db_query_cache_size: int = 1200
+    db_debug: bool = False
+    db_debug_slow_query_ms: float = 100.0
+    db_debug_repeated_query_threshold: int = 5
+    sqlite_journal_mode: Optional[str] = 'WAL'
+    sqlite_synchronous: Optional[str] = 'NORMAL'
+    sqlite_mmap_size: Optional[int] = 256 * 1024 * 1024
+    sqlite_cache_size_kib: Optional[int] = 64 * 1024
+    sqlite_busy_timeout_ms: Optional[int] = 5000
+    sqlite_foreign_keys: bool = True
+    server_host: str = '127.0.0.1'
+    server_port: int = 8000
+    server_workers: Optional[int] = None
+    server_backlog: int = 2048
+    server_keep_alive_seconds: int = 5
+    server_graceful_shutdown_seconds: int = 30
+    warmup_db_connections: int = 2
+    warmup_password_hashing: bool = True
     secret: str
     jwt_algorithm: str = "HS256"
     access_token_expiration_seconds: int = 60 * 15
+    token_storage_url: Optional[str] = None
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 64
+    password_hash_executor: Literal['thread', 'process'] = 'thread'
+    password_schemes: list[Literal['argon2', 'bcrypt']] = ['bcrypt']
+    bcrypt_rounds: int = 12
+    argon2_time_cost: int = 3
+    argon2_memory_cost_kib: int = 64 * 1024
+    argon2_parallelism: int = 2
+    password_verify_target_ms: float = 250
+    comments_page_size: int = 20
+    comments_max_page_size: int = 100
+    comments_bulk_max_size: int = 1000
+    comments_export_batch_size: int = 1000
+    user_cache_size: int = 10_000
+    user_cache_ttl_seconds: float = 30.0
+    token_cache_size: int = 10_000
+    token_cache_ttl_seconds: float = 30.0
+    search_cache_size: int = 1024
+    search_cache_max_bytes: int = 32 * 1024 * 1024
+    search_cache_ttl_seconds: float = 30.0
+    singleflight_max_waiters: int = 1000
+    singleflight_timeout_seconds: float = 10.0
+    login_username_rate_per_minute: float = 10
+    login_username_burst: int = 10
+    login_client_rate_per_minute: float = 60
+    login_client_burst: int = 30
+    login_throttle_size: int = 100_000
+    last_login_flush_interval_seconds: float = 5.0
+    last_login_flush_max_entries: int = 1000
 
     model_config = SettingsConfigDict(
         env_file=env_path,
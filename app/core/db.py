@@ -1,17 +1,99 @@
 from typing import AsyncGenerator
 
 
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
-    AsyncSession, async_sessionmaker, create_async_engine
+    AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 )
 from sqlalchemy.orm import DeclarativeBase
 
-from app.core.config import settings
+from app.core.config import Settings, settings
 
 
-async_engine = create_async_engine(settings.database_url)
+READ_YOUR_WRITES_HEADER = 'X-Read-Your-Writes'
 
-async_session_factory = async_sessionmaker(async_engine, class_=AsyncSession)
+
+def sqlite_pragmas(config: Settings, read_only: bool = False) -> list[str]:
+    """PRAGMA statements applied to every new SQLite connection.
+
+    The journal mode is a property of the database file and cannot be
+    switched from a read-only connection, so replicas skip it.
+    """
+    pragmas = []
+    if config.sqlite_journal_mode and not read_only:
+        pragmas.append(f"PRAGMA journal_mode={config.sqlite_journal_mode}")
+    if config.sqlite_synchronous:
+        pragmas.append(f"PRAGMA synchronous={config.sqlite_synchronous}")
+    if config.sqlite_mmap_size is not None:
+        pragmas.append(f"PRAGMA mmap_size={config.sqlite_mmap_size:d}")
+    if config.sqlite_cache_size_kib is not None:
+        # A negative cache_size is a size in KiB rather than in pages.
+        pragmas.append(f"PRAGMA cache_size=-{config.sqlite_cache_size_kib:d}")
+    if config.sqlite_busy_timeout_ms is not None:
+        pragmas.append(f"PRAGMA busy_timeout={config.sqlite_busy_timeout_ms:d}")
+    pragmas.append(
+        f"PRAGMA foreign_keys={'ON' if config.sqlite_foreign_keys else 'OFF'}"
+    )
+    return pragmas
+
+
+def build_engine(
+        url: str,
+        config: Settings,
+        read_only: bool = False,
+) -> AsyncEngine:
+    """Create an engine with pool options and SQLite pragmas from config"""
+    backend = make_url(url).get_backend_name()
+    database = make_url(url).database
+    options = {
+        'echo': config.db_echo,
+        'query_cache_size': config.db_query_cache_size,
+        'pool_pre_ping': (
+            backend != 'sqlite' if config.db_pool_pre_ping is None
+            else config.db_pool_pre_ping
+        ),
+    }
+    # In-memory SQLite lives in a single connection (StaticPool),
+    # sizing options only apply to file and server databases.
+    if not (backend == 'sqlite' and database in (None, '', ':memory:')):
+        options.update(
+            pool_size=config.db_pool_size,
+            max_overflow=config.db_max_overflow,
+            pool_timeout=config.db_pool_timeout,
+            pool_recycle=config.db_pool_recycle,
+        )
+    engine = create_async_engine(url, **options)
+
+    if backend == 'sqlite':
+        pragmas = sqlite_pragmas(config, read_only)
+
+        @event.listens_for(engine.sync_engine, 'connect')
+        def apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+
+    return engine
+
+
+async_engine = build_engine(settings.database_url, settings)
+
+async_session_factory = async_sessionmaker(
+    async_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+# Without a configured replica reads simply go to the primary.
+async_read_engine = (
+    build_engine(settings.database_read_url, settings, read_only=True)
+    if settings.database_read_url else async_engine
+)
+
+async_read_session_factory = async_sessionmaker(
+    async_read_engine, class_=AsyncSession, expire_on_commit=False
+)
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
@@ -25,6 +107,29 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
             await async_session.close()
 
 
+def read_session_factory(request: Request) -> async_sessionmaker:
+    """Read replica, or the primary for clients that must see their
+    own just-committed writes and send the X-Read-Your-Writes header.
+    """
+    if request.headers.get(READ_YOUR_WRITES_HEADER):
+        return async_session_factory
+    return async_read_session_factory
+
+
+async def get_read_session(
+        request: Request,
+) -> AsyncGenerator[AsyncSession, None]:
+    """Session on the read replica for GET routes"""
+    async with read_session_factory(request)() as async_session:
+        try:
+            yield async_session
+        except Exception as e:
+            await async_session.rollback()
+            raise e
+        finally:
+            await async_session.close()
+
+
 class Base(DeclarativeBase):
 
     def __repr__(self):
@@ -0,0 +1,273 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Callable, Iterable, Iterator, Optional, Sequence
+from weakref import WeakSet
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def escape(value: str) -> str:
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
+
+
+def format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Metric family rendered in the Prometheus text exposition format.
+
+    Samples are kept in plain dicts keyed by label value tuples and are
+    updated from the event loop thread only, so there is no locking.
+    """
+    kind = 'untyped'
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: dict[tuple, float] = {}
+
+    def labels_text(self, labels: tuple, extra: Sequence = ()) -> str:
+        pairs = [
+            f'{name}="{escape(value)}"'
+            for name, value in (*zip(self.labelnames, labels), *extra)
+        ]
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in self.values.items():
+            yield f'{self.name}{self.labels_text(labels)} {format_value(value)}'
+
+    def render(self) -> Iterator[str]:
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} {self.kind}'
+        yield from self.samples()
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def set_total(self, value: float, labels: tuple = ()) -> 'Counter':
+        """Expose a total counted elsewhere, for scrape time collectors"""
+        self.values[labels] = value
+        return self
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, labels: tuple = (), value: float = 0) -> 'Gauge':
+        self.values[labels] = value
+        return self
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, labels: tuple = (), amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) - amount
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: counts per bucket (non-cumulative), sum, count.
+        self.values: dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        state = self.values.get(labels)
+        if state is None:
+            state = self.values[labels] = [[0] * len(self.buckets), 0.0, 0]
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            state[0][index] += 1
+        state[1] += value
+        state[2] += 1
+
+    def samples(self) -> Iterator[str]:
+        for labels, (counts, total, count) in self.values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield (f'{self.name}_bucket'
+                       f'{self.labels_text(labels, [("le", format_value(bound))])}'
+                       f' {cumulative}')
+            yield (f'{self.name}_bucket'
+                   f'{self.labels_text(labels, [("le", "+Inf")])} {count}')
+            yield f'{self.name}_sum{self.labels_text(labels)} {total!r}'
+            yield f'{self.name}_count{self.labels_text(labels)} {count}'
+
+
+class Registry:
+    """Metrics updated in place plus collectors called at scrape time"""
+
+    def __init__(self):
+        self.metrics: list[Metric] = []
+        self.collectors: list[Callable[[], Iterable[Metric]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def collector(self, func: Callable[[], Iterable[Metric]]):
+        self.collectors.append(func)
+        return func
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for collect in self.collectors:
+            for metric in collect():
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    'http_requests_total', 'HTTP responses by route and status',
+    ('method', 'route', 'status'),
+))
+http_request_duration = registry.register(Histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route',
+    ('method', 'route'),
+))
+http_requests_in_progress = registry.register(Gauge(
+    'http_requests_in_progress', 'HTTP requests being served',
+    ('method',),
+))
+http_request_db_queries = registry.register(Histogram(
+    'http_request_db_queries', 'SQL statements executed per request',
+    ('method', 'route'), buckets=QUERY_COUNT_BUCKETS,
+))
+http_request_db_duration = registry.register(Histogram(
+    'http_request_db_duration_seconds', 'Time spent in SQL per request',
+    ('method', 'route'),
+))
+db_query_duration = registry.register(Histogram(
+    'db_query_duration_seconds', 'SQL statement execution time',
+    ('engine',),
+))
+
+
+@dataclass
+class RequestStats:
+    """Database work done while serving the current request"""
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    'request_stats', default=None
+)
+
+
+instrumented_engines: WeakSet = WeakSet()
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Time every statement of the engine and charge it to the request"""
+    if engine.sync_engine in instrumented_engines:
+        return
+    instrumented_engines.add(engine.sync_engine)
+
+    @event.listens_for(engine.sync_engine, 'before_cursor_execute')
+    def start_timer(conn, cursor, statement, parameters, context,
+                    executemany):
+        conn.info.setdefault('query_started_at', []).append(perf_counter())
+
+    @event.listens_for(engine.sync_engine, 'after_cursor_execute')
+    def stop_timer(conn, cursor, statement, parameters, context,
+                   executemany):
+        elapsed = perf_counter() - conn.info['query_started_at'].pop()
+        db_query_duration.observe((name,), elapsed)
+        stats = request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+    @event.listens_for(engine.sync_engine, 'handle_error')
+    def drop_timer(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get('query_started_at'):
+            connection.info['query_started_at'].pop()
+
+
+def route_name(scope: dict) -> str:
+    """Path template of the matched route, so ids do not explode labels"""
+    route = scope.get('route')
+    return getattr(route, 'path', None) or 'unmatched'
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, status and DB work"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        http_requests_in_progress.inc((method,))
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = perf_counter() - started
+            http_requests_in_progress.dec((method,))
+            request_stats.reset(token)
+            route = route_name(scope)
+            http_requests.inc((method, route, str(status_code)))
+            http_request_duration.observe((method, route), elapsed)
+            http_request_db_queries.observe((method, route), stats.queries)
+            http_request_db_duration.observe(
+                (method, route), stats.db_seconds
+            )
@@ -0,0 +1,73 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, Select, tuple_
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Pack keyset values of the last returned row into an opaque cursor"""
+    raw = json.dumps(
+        [value.isoformat() if isinstance(value, datetime) else value
+         for value in values],
+        separators=(',', ':'),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """Unpack a cursor into values typed after the keyset columns"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return [
+            datetime.fromisoformat(value)
+            if isinstance(column.type, DateTime) else value
+            for value, column in zip(values, columns)
+        ]
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Invalid cursor'
+        )
+
+
+def paginate(
+        query: Select,
+        columns: Sequence[Any],
+        limit: int,
+        cursor: str | None = None,
+        descending: bool = True,
+) -> Select:
+    """Apply keyset filter, ordering and limit to a query.
+
+    One extra row is requested to know whether a next page exists,
+    see ``split_page``.
+    """
+    if cursor is not None:
+        values = decode_cursor(cursor, columns)
+        key = tuple_(*columns)
+        query = query.where(
+            key < tuple_(*values) if descending else key > tuple_(*values)
+        )
+    ordering = [
+        column.desc() if descending else column.asc() for column in columns
+    ]
+    return query.order_by(*ordering).limit(limit + 1)
+
+
+def split_page(
+        rows: Sequence[Any],
+        limit: int,
+        key,
+) -> Tuple[List[Any], str | None]:
+    """Cut the extra row off and build a cursor for the next page"""
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(key(items[-1]))
+    return items, next_cursor
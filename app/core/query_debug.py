@@ -0,0 +1,149 @@
+import logging
+import sys
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+from types import FrameType
+from typing import Iterator, Optional
+from weakref import WeakSet
+
+from greenlet import getcurrent
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+QUERY_SUMMARY_HEADER = 'X-Query-Summary'
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryLog:
+    """Statements run while serving the current request"""
+    shapes: Counter = field(default_factory=Counter)
+    seconds: float = 0.0
+
+    @property
+    def summary(self) -> str:
+        repeated = max(self.shapes.values(), default=0)
+        return (f'queries={sum(self.shapes.values())}; '
+                f'distinct={len(self.shapes)}; '
+                f'max_repeat={repeated}; '
+                f'db_ms={self.seconds * 1000:.2f}')
+
+
+query_log: ContextVar[Optional[QueryLog]] = ContextVar(
+    'query_log', default=None
+)
+
+
+def caller_frames() -> Iterator[FrameType]:
+    """Frames of the current thread, including the awaiting coroutines.
+
+    Engine events of the async engine run in a greenlet whose stack
+    ends at SQLAlchemy, the application code that awaited the query
+    is on the stacks of the parent greenlets.
+    """
+    frame = sys._getframe(1)
+    current = getcurrent()
+    while True:
+        while frame is not None:
+            yield frame
+            frame = frame.f_back
+        current = current.parent
+        if current is None:
+            return
+        frame = current.gr_frame
+
+
+def calling_function() -> str:
+    """Innermost application function outside app.core that ran a query"""
+    for frame in caller_frames():
+        module = frame.f_globals.get('__name__', '')
+        if module.startswith('app.') and not module.startswith('app.core'):
+            return f'{module}.{frame.f_code.co_name}'
+    return 'unknown'
+
+
+debugged_engines: WeakSet = WeakSet()
+
+
+def attach_query_debugger(engine: AsyncEngine, name: str) -> None:
+    """Log slow statements and record statement shapes per request"""
+    if engine.sync_engine in debugged_engines:
+        return
+    debugged_engines.add(engine.sync_engine)
+    slow_seconds = settings.db_debug_slow_query_ms / 1000
+
+    @event.listens_for(engine.sync_engine, 'before_cursor_execute')
+    def start_timer(conn, cursor, statement, parameters, context,
+                    executemany):
+        conn.info.setdefault('debug_started_at', []).append(perf_counter())
+
+    @event.listens_for(engine.sync_engine, 'after_cursor_execute')
+    def check_query(conn, cursor, statement, parameters, context,
+                    executemany):
+        elapsed = perf_counter() - conn.info['debug_started_at'].pop()
+        log = query_log.get()
+        if log is not None:
+            log.shapes[statement] += 1
+            log.seconds += elapsed
+        if elapsed >= slow_seconds:
+            logger.warning(
+                'Slow query on %s: %.1f ms in %s\n%s\nparameters: %r',
+                name, elapsed * 1000, calling_function(),
+                statement, parameters,
+            )
+
+    @event.listens_for(engine.sync_engine, 'handle_error')
+    def drop_timer(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get('debug_started_at'):
+            connection.info['debug_started_at'].pop()
+
+
+class QueryDebugMiddleware:
+    """Flags repeated statement shapes and reports per-request queries.
+
+    Requests sending the X-Query-Summary header get the summary of
+    their statements back in the header of the same name.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.threshold = settings.db_debug_repeated_query_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        log = QueryLog()
+        token = query_log.set(log)
+        wants_summary = any(
+            name.decode('latin-1').lower() == QUERY_SUMMARY_HEADER.lower()
+            for name, _ in scope['headers']
+        )
+
+        async def send_with_summary(message):
+            if wants_summary and message['type'] == 'http.response.start':
+                message.setdefault('headers', [])
+                message['headers'] = [
+                    *message['headers'],
+                    (QUERY_SUMMARY_HEADER.encode('latin-1'),
+                     log.summary.encode('latin-1')),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_summary)
+        finally:
+            query_log.reset(token)
+            for statement, count in log.shapes.items():
+                if count > self.threshold:
+                    logger.warning(
+                        'Possible N+1 in %s %s: statement ran %d times\n%s',
+                        scope['method'], scope['path'], count, statement,
+                    )
@@ -0,0 +1,52 @@
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+
+from fastapi import status
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded by pydantic-core instead of the json module"""
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+@lru_cache(maxsize=None)
+def type_adapter(schema: Any) -> TypeAdapter:
+    """Build the validator and serializer of the schema once per process"""
+    return TypeAdapter(schema)
+
+
+def dump_json(schema: Any, content: Any) -> bytes:
+    """Serialize ORM objects or plain data straight to JSON bytes.
+
+    The content is validated against the schema exactly once, reading
+    attributes of ORM objects directly, and dumped by pydantic-core
+    without a jsonable_encoder pass.
+    """
+    adapter = type_adapter(schema)
+    return adapter.dump_json(
+        adapter.validate_python(content, from_attributes=True)
+    )
+
+
+def model_response(
+        schema: Any,
+        content: Any,
+        status_code: int = status.HTTP_200_OK,
+        headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """Response for endpoints that skip FastAPI response_model handling.
+
+    Keep response_model on the route for the OpenAPI schema, returning
+    a Response makes FastAPI bypass its own validation and encoding.
+    """
+    return Response(
+        dump_json(schema, content),
+        status_code=status_code,
+        headers=headers,
+        media_type='application/json',
+    )
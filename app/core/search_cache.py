@@ -0,0 +1,96 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Hashable, NamedTuple, Optional
+
+from app.core.config import settings
+
+
+class Entry(NamedTuple):
+    version: int
+    expires_at: float
+    body: bytes
+
+
+class VersionedCache:
+    """Bounded LRU of serialized responses tied to a data version.
+
+    Every write to the underlying data bumps ``version``, which makes
+    all entries stale at once without walking them; stale entries are
+    dropped when they are next looked up or pushed out by the LRU.
+    Entries are also bounded by total body size, and the TTL bounds
+    staleness caused by writes that other processes make.
+    """
+
+    def __init__(self, maxsize: int, max_bytes: int, ttl: float):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.version = 0
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[Hashable, Entry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def bump(self) -> None:
+        self.version += 1
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.version != self.version or entry.expires_at <= monotonic():
+            self.discard(key)
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry.body
+
+    def set(self, key: Hashable, body: bytes, version: int) -> None:
+        """Store a body built from data at ``version``.
+
+        Bodies built before a concurrent write are not stored.
+        """
+        if (self.maxsize <= 0 or version != self.version
+                or len(body) > self.max_bytes):
+            return
+        self.discard(key)
+        self._data[key] = Entry(version, monotonic() + self.ttl, body)
+        self.bytes += len(body)
+        while len(self._data) > self.maxsize or self.bytes > self.max_bytes:
+            _, evicted = self._data.popitem(last=False)
+            self.bytes -= len(evicted.body)
+            self.evictions += 1
+
+    def discard(self, key: Hashable) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.bytes -= len(entry.body)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.bytes = 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'version': self.version,
+        }
+
+
+search_cache = VersionedCache(
+    maxsize=settings.search_cache_size,
+    max_bytes=settings.search_cache_max_bytes,
+    ttl=settings.search_cache_ttl_seconds,
+)
@@ -1,7 +1,50 @@
-from passlib.context import CryptContext
+import asyncio
+import statistics
+from concurrent.futures import (
+    Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+)
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Iterator, Optional, Sequence
+
+from fastapi import HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def build_password_context(
+        schemes: Sequence[str],
+        bcrypt_rounds: int,
+        argon2_time_cost: int,
+        argon2_memory_cost_kib: int,
+        argon2_parallelism: int,
+) -> CryptContext:
+    """New hashes use the first scheme, the others are only verified.
+
+    bcrypt rounds are pinned from both sides, so hashes made at a higher
+    or a lower cost are flagged by needs_update like the argon2 ones.
+    """
+    return CryptContext(
+        schemes=list(schemes),
+        deprecated='auto',
+        bcrypt__default_rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        bcrypt__max_rounds=bcrypt_rounds,
+        argon2__time_cost=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_cost_kib,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+
+pwd_context = build_password_context(
+    settings.password_schemes,
+    bcrypt_rounds=settings.bcrypt_rounds,
+    argon2_time_cost=settings.argon2_time_cost,
+    argon2_memory_cost_kib=settings.argon2_memory_cost_kib,
+    argon2_parallelism=settings.argon2_parallelism,
+)
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl='/auth/login',
@@ -21,3 +64,167 @@ def verify_password(
 ) -> bool:
     """Hash password function"""
     return pwd_context.verify(to_be_verified_password, password)
+
+
+def verify_and_update_password(
+        to_be_verified_password: str,
+        password: str,
+) -> tuple[bool, Optional[str]]:
+    """Verify password and rehash it if the hash is outdated"""
+    return pwd_context.verify_and_update(to_be_verified_password, password)
+
+
+def time_verify(context: CryptContext, samples: int) -> float:
+    """Median seconds to verify a password hashed by ``context``"""
+    hashed = context.hash('calibration')
+    timings = []
+    for _ in range(samples):
+        started = perf_counter()
+        context.verify('calibration', hashed)
+        timings.append(perf_counter() - started)
+    return statistics.median(timings)
+
+
+COST_PARAMETERS = {
+    'bcrypt': ('bcrypt_rounds', range(4, 32)),
+    'argon2': ('argon2_time_cost', range(1, 65)),
+}
+
+
+def calibrate_cost(
+        scheme: str,
+        target_seconds: float,
+        samples: int = 5,
+        **costs: int,
+) -> Iterator[tuple[int, float]]:
+    """Verify time of increasing costs of ``scheme``, up to the target.
+
+    The other cost parameters come from ``costs`` or the settings; the
+    last cost yielded is the first one over ``target_seconds``.
+    """
+    parameter, candidates = COST_PARAMETERS[scheme]
+    params = {
+        'bcrypt_rounds': settings.bcrypt_rounds,
+        'argon2_time_cost': settings.argon2_time_cost,
+        'argon2_memory_cost_kib': settings.argon2_memory_cost_kib,
+        'argon2_parallelism': settings.argon2_parallelism,
+        **costs,
+    }
+    for cost in candidates:
+        params[parameter] = cost
+        seconds = time_verify(
+            build_password_context([scheme], **params), samples
+        )
+        yield cost, seconds
+        if seconds > target_seconds:
+            return
+
+
+@dataclass
+class HashingMetrics:
+    """Counters of the password hashing pool"""
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    pending: int = 0
+    max_pending: int = 0
+    total_seconds: float = 0.0
+
+
+class PasswordHashingPool:
+    """Runs password hashing off the event loop in a bounded pool.
+
+    bcrypt and argon2 release the GIL, so a thread pool is enough by default;
+    a process pool can be selected for hashers that do not.
+    Calls above ``max_pending`` are rejected with 503 instead of queueing
+    without limit. A slot is released when the job finishes, not when
+    its caller stops waiting, so the bound holds for the executor queue.
+    """
+
+    def __init__(self, workers: int, max_pending: int, kind: str = 'thread'):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.kind = kind
+        self.metrics = HashingMetrics()
+        self._executor: Executor | None = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            executor_class = (
+                ProcessPoolExecutor if self.kind == 'process'
+                else ThreadPoolExecutor
+            )
+            self._executor = executor_class(max_workers=self.workers)
+        return self._executor
+
+    async def run(self, func, *args):
+        if self.metrics.pending >= self.max_pending:
+            self.metrics.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail='Too many authentication requests, try again later',
+                headers={'Retry-After': '1'},
+            )
+        self.metrics.pending += 1
+        self.metrics.max_pending = max(
+            self.metrics.max_pending, self.metrics.pending
+        )
+        started = perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            job = self.executor.submit(func, *args)
+        except Exception:
+            self.metrics.pending -= 1
+            self.metrics.failed += 1
+            raise
+        job.add_done_callback(
+            lambda job: loop.call_soon_threadsafe(self.release, job, started)
+        )
+        return await asyncio.wrap_future(job)
+
+    def release(self, job: Future, started: float) -> None:
+        """Count a finished job on the event loop thread"""
+        self.metrics.pending -= 1
+        self.metrics.total_seconds += perf_counter() - started
+        if job.cancelled() or job.exception() is not None:
+            self.metrics.failed += 1
+        else:
+            self.metrics.completed += 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+hashing_pool = PasswordHashingPool(
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+    kind=settings.password_hash_executor,
+)
+
+
+async def async_get_password_hash(password: str) -> str:
+    """Hash password in the hashing pool"""
+    return await hashing_pool.run(get_password_hash, password)
+
+
+async def async_verify_password(
+        to_be_verified_password: str,
+        password: str,
+) -> bool:
+    """Verify password in the hashing pool"""
+    return await hashing_pool.run(
+        verify_password, to_be_verified_password, password
+    )
+
+
+async def async_verify_and_update_password(
+        to_be_verified_password: str,
+        password: str,
+) -> tuple[bool, Optional[str]]:
+    """Verify and rehash password in the hashing pool"""
+    return await hashing_pool.run(
+        verify_and_update_password, to_be_verified_password, password
+    )
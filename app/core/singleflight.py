@@ -0,0 +1,91 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+T = TypeVar('T')
+
+
+class Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs one call per key at a time and shares its result.
+
+    The call runs in its own task, so a caller that disconnects does not
+    cancel it for the others. At most ``max_waiters`` callers join one
+    flight, the rest make their own call; callers give up after
+    ``timeout`` seconds with 503. Calls must not use request scoped
+    resources such as the request's database session.
+    """
+
+    def __init__(self, max_waiters: int, timeout: float):
+        self.max_waiters = max_waiters
+        self.timeout = timeout
+        self.flights: dict[Hashable, Flight] = {}
+        self.started = 0
+        self.coalesced = 0
+        self.overflows = 0
+        self.timeouts = 0
+
+    def __len__(self) -> int:
+        return len(self.flights)
+
+    def start(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> Flight:
+        task = asyncio.ensure_future(call())
+        flight = self.flights[key] = Flight(task)
+        self.started += 1
+
+        def land(task: asyncio.Task) -> None:
+            if self.flights.get(key) is flight:
+                del self.flights[key]
+            if not task.cancelled():
+                task.exception()  # retrieved even if every caller timed out
+
+        task.add_done_callback(land)
+        return flight
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        flight = self.flights.get(key)
+        if flight is None:
+            flight = self.start(key, call)
+        elif flight.waiters >= self.max_waiters:
+            self.overflows += 1
+            return await call()
+        else:
+            self.coalesced += 1
+        flight.waiters += 1
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(flight.task), self.timeout
+            )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail='The request took too long, try again later',
+                headers={'Retry-After': '1'},
+            )
+        finally:
+            flight.waiters -= 1
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            'in_flight': len(self.flights),
+            'started': self.started,
+            'coalesced': self.coalesced,
+            'overflows': self.overflows,
+            'timeouts': self.timeouts,
+        }
+
+
+read_flights = SingleFlight(
+    max_waiters=settings.singleflight_max_waiters,
+    timeout=settings.singleflight_timeout_seconds,
+)
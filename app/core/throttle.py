@@ -0,0 +1,100 @@
+from collections import OrderedDict
+from math import ceil
+from time import monotonic
+from typing import Hashable, Optional
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+
+class TokenBucketLimiter:
+    """Token bucket per key, kept in a bounded LRU.
+
+    Every key may spend ``burst`` attempts at once and regains ``rate``
+    attempts per second. Least recently used buckets are dropped when
+    ``maxsize`` keys are tracked, so memory stays bounded; a dropped key
+    simply starts again with a full bucket.
+    """
+
+    def __init__(self, rate: float, burst: int, maxsize: int):
+        self.rate = rate
+        self.burst = burst
+        self.maxsize = maxsize
+        self.allowed = 0
+        self.limited = 0
+        self.evictions = 0
+        self._buckets: OrderedDict[Hashable, tuple[float, float]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def tokens(self, key: Hashable, now: float) -> float:
+        tokens, updated_at = self._buckets.get(key, (self.burst, now))
+        return min(self.burst, tokens + (now - updated_at) * self.rate)
+
+    def check(self, key: Hashable) -> float:
+        """Return 0 or the seconds until a token is available, take none"""
+        if self.maxsize <= 0:
+            return 0.0
+        tokens = self.tokens(key, monotonic())
+        if tokens < 1:
+            self.limited += 1
+            return (1 - tokens) / self.rate
+        return 0.0
+
+    def take(self, key: Hashable) -> None:
+        """Spend one token, after check found one available"""
+        if self.maxsize <= 0:
+            return
+        now = monotonic()
+        self._buckets[key] = (self.tokens(key, now) - 1, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+            self.evictions += 1
+        self.allowed += 1
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'size': len(self._buckets),
+            'maxsize': self.maxsize,
+            'allowed': self.allowed,
+            'limited': self.limited,
+            'evictions': self.evictions,
+        }
+
+
+username_limiter = TokenBucketLimiter(
+    rate=settings.login_username_rate_per_minute / 60,
+    burst=settings.login_username_burst,
+    maxsize=settings.login_throttle_size,
+)
+client_limiter = TokenBucketLimiter(
+    rate=settings.login_client_rate_per_minute / 60,
+    burst=settings.login_client_burst,
+    maxsize=settings.login_throttle_size,
+)
+
+
+def check_login_throttle(username: str, client: Optional[str]) -> None:
+    """Reject the login attempt before any password is verified.
+
+    Tokens are spent only when every bucket allows the attempt, so a
+    throttled client cannot drain the bucket of someone's username.
+    """
+    buckets = [(username_limiter, username)]
+    if client is not None:
+        buckets.append((client_limiter, client))
+    retry_after = max(limiter.check(key) for limiter, key in buckets)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail='Too many login attempts, try again later',
+            headers={'Retry-After': str(ceil(retry_after))},
+        )
+    for limiter, key in buckets:
+        limiter.take(key)
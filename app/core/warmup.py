@@ -0,0 +1,62 @@
+import asyncio
+import logging
+from time import perf_counter
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.responses import type_adapter
+from app.core.security import (
+    get_password_hash, hashing_pool, verify_password
+)
+from app.schemas.auth import AuthUser
+from app.schemas.comment import (
+    CommentBulkResult, CommentDB, CommentPage, CommentResponse
+)
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_SCHEMAS = (
+    AuthUser, CommentBulkResult, CommentDB, CommentPage, CommentResponse
+)
+
+
+async def open_connections(engine: AsyncEngine, count: int) -> None:
+    """Check out ``count`` connections at once so the pool keeps them"""
+    async def ping():
+        async with engine.connect() as connection:
+            await connection.exec_driver_sql('SELECT 1')
+
+    await asyncio.gather(*(ping() for _ in range(count)))
+
+
+async def warm_password_hashing() -> None:
+    """Load the hash backend and start every hashing worker.
+
+    Only module-level functions are sent to the pool, so this also
+    works when the workers are processes.
+    """
+    hashed = await hashing_pool.run(get_password_hash, 'warm-up')
+    await asyncio.gather(*(
+        hashing_pool.run(verify_password, 'warm-up', hashed)
+        for _ in range(hashing_pool.workers)
+    ))
+
+
+def warm_serializers() -> None:
+    for schema in RESPONSE_SCHEMAS:
+        type_adapter(schema)
+
+
+async def warm_up(*engines: AsyncEngine) -> None:
+    """Pay the first request costs before the worker takes traffic"""
+    started = perf_counter()
+    warm_serializers()
+    tasks = [
+        open_connections(engine, settings.warmup_db_connections)
+        for engine in engines
+    ]
+    if settings.warmup_password_hashing:
+        tasks.append(warm_password_hashing())
+    await asyncio.gather(*tasks)
+    logger.info('Warm-up finished in %.0f ms', (perf_counter() - started) * 1000)
@@ -1,22 +1,31 @@
-from datetime import UTC
-from typing import Annotated, TYPE_CHECKING
+import logging
+from datetime import datetime
+from typing import Annotated, Dict, TYPE_CHECKING
 
-from fastapi import Depends, Form, HTTPException, status
-from sqlalchemy import select, func
+from fastapi import Depends, Form, HTTPException, Request, status
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.db import get_async_session
-from app.core.security import verify_password
+from app.core.security import async_verify_and_update_password
+from app.core.throttle import check_login_throttle
 from app.models import UsersORM
 from app.schemas.auth import AuthUser
 if TYPE_CHECKING:
     from sqlalchemy.ext.asyncio import AsyncSession
 
+logger = logging.getLogger(__name__)
+
 
 async def validate_auth_user(
         username: Annotated[str, Form(...)],
         password: Annotated[str, Form(...)],
         session: Annotated["AsyncSession", Depends(get_async_session)],
+        request: Request,
 ) -> AuthUser:
+    check_login_throttle(
+        username, request.client.host if request.client else None
+    )
     auth_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail='Invalid username or password'
@@ -27,8 +36,13 @@ async def validate_auth_user(
         )
     )
     db_user = query.scalars().first()
+    if not db_user:
+        raise auth_exception
 
-    if not db_user or not verify_password(password, db_user.password):
+    verified, new_hash = await async_verify_and_update_password(
+        password, db_user.password
+    )
+    if not verified:
         raise auth_exception
 
     if not db_user.is_active:
@@ -37,6 +51,9 @@ async def validate_auth_user(
             detail='User inactive'
         )
 
+    if new_hash is not None:
+        await rehash_password(db_user.id, db_user.password, new_hash, session)
+
     return AuthUser(
         id=db_user.id,
         username=db_user.username,
@@ -44,25 +61,48 @@ async def validate_auth_user(
     )
 
 
-async def last_login(
-        user: AuthUser,
+async def rehash_password(
+        user_id: int,
+        old_hash: str,
+        new_hash: str,
         session: "AsyncSession",
-) -> UsersORM:
-    query = await session.execute(
-        select(UsersORM).where(
-            UsersORM.username == user.username
-        )
-    )
-    user_db = query.scalars().first()
+) -> None:
+    """Store a hash made with the current scheme and cost.
 
-    if not user_db:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
+    Only replaces the hash that was verified, so a password changed in
+    the meantime is kept. A failed write is logged and retried on the
+    next login instead of failing this one.
+    """
+    users = UsersORM.__table__
+    try:
+        await session.execute(
+            update(users)
+            .where(users.c.id == user_id, users.c.password == old_hash)
+            .values(password=new_hash)
         )
+        await session.commit()
+    except SQLAlchemyError:
+        await session.rollback()
+        logger.exception('Failed to rehash the password of user %d', user_id)
+
 
-    user_db.last_login = func.datetime.now(UTC)
-    session.add(user_db)
+async def update_last_logins(
+        logins: Dict[int, datetime],
+        session: "AsyncSession",
+) -> None:
+    """Write buffered login times with one executemany UPDATE.
+
+    Runs against the table rather than the mapped class, so users
+    deleted in the meantime are skipped instead of failing the batch.
+    """
+    users = UsersORM.__table__
+    await session.execute(
+        update(users)
+        .where(users.c.id == bindparam('user_id'))
+        .values(last_login=bindparam('logged_in_at')),
+        [
+            {'user_id': user_id, 'logged_in_at': logged_in_at}
+            for user_id, logged_in_at in logins.items()
+        ],
+    )
     await session.commit()
-    await session.refresh(user_db)
-    return user_db
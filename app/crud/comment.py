@@ -1,92 +1,290 @@
-from typing import List, TYPE_CHECKING
+import re
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import (
+    AsyncIterator, List, Optional, Sequence, Set, Tuple, TYPE_CHECKING
+)
 
 from fastapi import status
-from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import HTTPException
 
-from sqlalchemy import select
+from sqlalchemy import (
+    Integer, Row, delete, insert, literal, literal_column, or_, select,
+    update
+)
 
-from app.models import CommentsORM
+from app.core.auth.cache import invalidate_user
+from app.core.pagination import paginate, split_page
+from app.core.search_cache import search_cache
+from app.models import CommentsORM, UsersORM, comments_fts
 from app.schemas.auth import AuthUser
-from app.schemas.comment import CommentCreate, CommentUpdate
+from app.schemas.comment import (
+    CommentBulkItem, CommentCreate, CommentUpdate
+)
 if TYPE_CHECKING:
     from sqlalchemy.ext.asyncio import AsyncSession
 
+COMMENT_KEYSET = (CommentsORM.created_at, CommentsORM.id)
+SEARCH_KEYSET = (comments_fts.c.rank, CommentsORM.id)
+PHRASE_PATTERN = re.compile(r'"([^"]*)"')
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def comment_keyset(comment: CommentsORM) -> Tuple:
+    return comment.created_at, comment.id
+
+
+def search_keyset(row) -> Tuple:
+    return row.rank, row.CommentsORM.id
+
+
+def invalidate_comment_counters(*user_ids: int) -> None:
+    """Cached users carry counters and rating kept up by database triggers"""
+    for user_id in user_ids:
+        invalidate_user(user_id)
+
+
+def build_fts_query(keyword: str) -> str:
+    """Translate a search keyword into an FTS5 MATCH expression.
+
+    Text in double quotes is matched as a phrase, every other word
+    as a prefix. FTS5 operators typed by the user are dropped.
+    """
+    terms = []
+    for phrase in PHRASE_PATTERN.findall(keyword):
+        words = WORD_PATTERN.findall(phrase)
+        if words:
+            terms.append('"' + ' '.join(words) + '"')
+    for word in WORD_PATTERN.findall(PHRASE_PATTERN.sub(' ', keyword)):
+        terms.append(f'"{word}"*')
+    return ' '.join(terms)
+
 
 async def create_comment(
         new_comment: CommentCreate,
         author: AuthUser,
         session: "AsyncSession",
-) -> CommentsORM:
-    new_comment_data = new_comment.dict()
-    new_comment_data['author_id'] = author.id
-    db_comment = CommentsORM(**new_comment_data)
-    session.add(db_comment)
+) -> CommentsORM | None:
+    """Insert the comment only if the recipient exists.
+
+    Returns None when there is no such user.
+    """
+    result = await session.execute(
+        insert(CommentsORM).from_select(
+            ['comment_text', 'user_id', 'author_id', 'score'],
+            select(
+                literal(new_comment.comment_text),
+                UsersORM.id,
+                literal(author.id),
+                literal(new_comment.score, Integer),
+            ).where(UsersORM.id == new_comment.user_id)
+        ).returning(CommentsORM)
+    )
+    db_comment = result.scalars().first()
     await session.commit()
-    await session.refresh(db_comment)
+    if db_comment is not None:
+        search_cache.bump()
+        invalidate_comment_counters(db_comment.author_id, db_comment.user_id)
     return db_comment
 
 
+async def create_comments_bulk(
+        new_comments: List[CommentCreate],
+        author: AuthUser,
+        existing_user_ids: Set[int],
+        session: "AsyncSession",
+) -> List[CommentBulkItem]:
+    """Insert all comments addressed to existing users in one transaction"""
+    items = []
+    rows = []
+    for index, new_comment in enumerate(new_comments):
+        if new_comment.user_id in existing_user_ids:
+            rows.append({**new_comment.model_dump(), 'author_id': author.id})
+            items.append(CommentBulkItem(index=index))
+        else:
+            items.append(CommentBulkItem(index=index, detail='User not found'))
+    if rows:
+        # SQLite cannot sort RETURNING rows by parameter order without
+        # falling back to one statement per row, so ids are matched back
+        # by every inserted column. Items equal in all of them are
+        # interchangeable.
+        result = await session.execute(
+            insert(CommentsORM).returning(
+                CommentsORM.id, CommentsORM.user_id,
+                CommentsORM.comment_text, CommentsORM.score,
+            ),
+            rows,
+        )
+        created = defaultdict(deque)
+        for comment_id, user_id, comment_text, score in result.all():
+            created[user_id, comment_text, score].append(comment_id)
+        for item, new_comment in zip(items, new_comments):
+            if item.detail is None:
+                item.id = created[
+                    new_comment.user_id, new_comment.comment_text,
+                    new_comment.score,
+                ].popleft()
+        await session.commit()
+        search_cache.bump()
+        invalidate_comment_counters(
+            author.id, *{row['user_id'] for row in rows}
+        )
+    return items
+
+
 async def get_comment_by_id(
         comment_id: int,
+        author: AuthUser,
         session: "AsyncSession",
 ) -> CommentsORM | None:
-    db_comment = await session.get(CommentsORM, comment_id)
+    db_comment = await session.scalar(
+        select(CommentsORM).where(
+            CommentsORM.id == comment_id,
+            CommentsORM.author_id == author.id,
+        )
+    )
     return db_comment
 
 
-async def get_comment_by_user(
+async def get_comment_version(
+        comment_id: int,
         author: AuthUser,
         session: "AsyncSession",
-) -> List[CommentsORM]:
-    query = await session.execute(
-        select(CommentsORM).where(
-            CommentsORM.author_id == author.id
+) -> datetime | None:
+    """updated_at of the author's comment, all a conditional GET needs"""
+    return await session.scalar(
+        select(CommentsORM.updated_at).where(
+            CommentsORM.id == comment_id,
+            CommentsORM.author_id == author.id,
         )
     )
-    result = query.scalars().all()
-    return list(result)
 
 
-async def search_comments_by_keyword(
-        keyword: str,
-        session: "AsyncSession"
-) -> List[CommentsORM]:
-    query = select(CommentsORM).where(
-        CommentsORM.comment_text.like(f"%{keyword}%")
+async def get_comment_by_user(
+        author: AuthUser,
+        session: "AsyncSession",
+        limit: int,
+        cursor: Optional[str] = None,
+) -> Tuple[List[CommentsORM], Optional[str]]:
+    query = paginate(
+        select(CommentsORM).where(CommentsORM.author_id == author.id),
+        COMMENT_KEYSET, limit, cursor
     )
     result = await session.execute(query)
-    comments = result.scalars().all()
-    if not comments:
+    return split_page(result.scalars().all(), limit, comment_keyset)
+
+
+async def search_comments_by_keyword(
+        keyword: str,
+        session: "AsyncSession",
+        limit: int,
+        cursor: Optional[str] = None,
+) -> Tuple[List[CommentsORM], Optional[str]]:
+    """Full text search ranked by BM25, best matches first"""
+    fts_query = build_fts_query(keyword)
+    comments = []
+    if fts_query:
+        query = paginate(
+            select(CommentsORM, comments_fts.c.rank)
+            .join(comments_fts, comments_fts.c.rowid == CommentsORM.id)
+            .where(literal_column("comments_fts").op("MATCH")(fts_query)),
+            SEARCH_KEYSET, limit, cursor, descending=False
+        )
+        result = await session.execute(query)
+        comments = result.all()
+    if not comments and cursor is None:
         raise HTTPException(
             status_code=status.HTTP_204_NO_CONTENT,
             detail="Comments not found"
         )
-    return list(comments)
+    rows, next_cursor = split_page(comments, limit, search_keyset)
+    return [row.CommentsORM for row in rows], next_cursor
+
+
+EXPORT_COLUMNS = (
+    CommentsORM.id,
+    CommentsORM.author_id,
+    CommentsORM.user_id,
+    CommentsORM.comment_text,
+    CommentsORM.created_at,
+    CommentsORM.updated_at,
+    CommentsORM.is_edited,
+    CommentsORM.score,
+)
+
+
+async def stream_comments_of_user(
+        user_id: int,
+        session: "AsyncSession",
+        batch_size: int,
+) -> AsyncIterator[Sequence[Row]]:
+    """Yield every comment written or received by the user in batches.
+
+    Rows are fetched through a server-side cursor, so only one batch
+    is held in memory at a time.
+    """
+    result = await session.stream(
+        select(*EXPORT_COLUMNS)
+        .where(or_(
+            CommentsORM.author_id == user_id,
+            CommentsORM.user_id == user_id,
+        ))
+        .order_by(CommentsORM.id)
+        .execution_options(yield_per=batch_size)
+    )
+    async for partition in result.partitions():
+        yield partition
 
 
 async def update_comment(
-        db_comment: CommentsORM,
+        comment_id: int,
         comment_in: CommentUpdate,
+        author: AuthUser,
         session: "AsyncSession",
-) -> CommentsORM:
-    obj_data = jsonable_encoder(db_comment)
-    update_data = comment_in.dict(exclude_unset=True)
-    db_comment.is_edited = True
-
-    for field in obj_data:
-        if field in update_data:
-            setattr(db_comment, field, update_data[field])
-    session.add(db_comment)
+) -> CommentsORM | None:
+    """Update the comment if it belongs to the author.
+
+    Returns None when there is no such comment of the author.
+    """
+    result = await session.execute(
+        update(CommentsORM)
+        .where(
+            CommentsORM.id == comment_id,
+            CommentsORM.author_id == author.id,
+        )
+        .values(**comment_in.model_dump(exclude_unset=True), is_edited=True)
+        .returning(CommentsORM)
+    )
+    db_comment = result.scalars().first()
     await session.commit()
-    await session.refresh(db_comment)
+    if db_comment is None:
+        return db_comment
+    search_cache.bump()
+    if 'score' in comment_in.model_fields_set:
+        invalidate_comment_counters(db_comment.user_id)
     return db_comment
 
 
 async def delete_comment(
-        db_comment: CommentsORM,
+        comment_id: int,
+        author: AuthUser,
         session: "AsyncSession",
-) -> CommentsORM:
-    await session.delete(db_comment)
+) -> CommentsORM | None:
+    """Delete the comment if it belongs to the author.
+
+    Returns None when there is no such comment of the author.
+    """
+    result = await session.execute(
+        delete(CommentsORM)
+        .where(
+            CommentsORM.id == comment_id,
+            CommentsORM.author_id == author.id,
+        )
+        .returning(CommentsORM)
+    )
+    db_comment = result.scalars().first()
     await session.commit()
+    if db_comment is not None:
+        search_cache.bump()
+        invalidate_comment_counters(db_comment.author_id, db_comment.user_id)
     return db_comment
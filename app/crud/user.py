@@ -1,11 +1,13 @@
-from typing import TYPE_CHECKING
+from typing import Dict, Iterable, Set, TYPE_CHECKING
 
 from fastapi import HTTPException, status
 
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
 
-from app.core.security import get_password_hash
-from app.models import UsersORM
+from app.core.auth.cache import invalidate_user
+from app.core.security import async_get_password_hash
+from app.models import CommentsORM, UsersORM
 from app.schemas.auth import AuthUser
 from app.schemas.user import UserCreate, UserUpdate
 
@@ -13,20 +15,40 @@ if TYPE_CHECKING:
     from sqlalchemy.ext.asyncio import AsyncSession
 
 
+UNIQUE_FIELDS = ('email', 'username')
+
+
+def unique_violation(error: IntegrityError) -> str | None:
+    """Name of the unique users column the failed statement collided on"""
+    message = str(error.orig)
+    for field in UNIQUE_FIELDS:
+        if f'users.{field}' in message:
+            return field
+    return None
+
+
 async def create_user(
         user_in: UserCreate,
         session: "AsyncSession",
 ) -> UsersORM:
-    hashed_password = get_password_hash(user_in.password)
-    new_user = UsersORM(
-        email=user_in.email,
-        password=hashed_password,
-        username=user_in.username,
-        birthday=user_in.birthday
-    )
-    session.add(new_user)
-    await session.commit()
-    await session.refresh(new_user)
+    hashed_password = await async_get_password_hash(user_in.password)
+    try:
+        result = await session.execute(
+            insert(UsersORM).values(
+                email=user_in.email,
+                password=hashed_password,
+                username=user_in.username,
+                birthday=user_in.birthday
+            ).returning(UsersORM)
+        )
+        new_user = result.scalars().one()
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail='UsersORM with these username or email already exists'
+        )
 
     return new_user
 
@@ -37,47 +59,145 @@ async def update_user(
         current_user: AuthUser,
         session: "AsyncSession",
 ) -> UsersORM:
-    query = await session.execute(select(UsersORM).where(UsersORM.id == user_id))
-    user = query.scalars().first()
+    if user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough authority to commit this action"
+        )
+
+    values = {}
+    if user_update.email:
+        values['email'] = user_update.email
+    if user_update.username:
+        values['username'] = user_update.username
+    if user_update.password:
+        values['password'] = await async_get_password_hash(
+            user_update.password
+        )
+    if user_update.birthday:
+        values['birthday'] = user_update.birthday
+
+    if values:
+        query = (
+            update(UsersORM)
+            .where(UsersORM.id == user_id)
+            .values(**values)
+            .returning(UsersORM)
+        )
+    else:
+        query = select(UsersORM).where(UsersORM.id == user_id)
+    try:
+        result = await session.execute(query)
+        user = result.scalars().first()
+        await session.commit()
+    except IntegrityError as error:
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"This {unique_violation(error) or 'value'} already exists"
+        )
+    invalidate_user(user_id)
+
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
 
-    if user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough authority to commit this action"
-        )
+    return user
 
-    if user_update.email and user_update.email != user.email:
-        existing = await session.execute(
-            select(UsersORM).where(UsersORM.email == user_update.email))
-        if existing.scalars().first():
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="This email already exists"
-            )
-        user.email = user_update.email
-
-    if user_update.username and user_update.username != user.username:
-        existing = await session.execute(
-            select(UsersORM).where(UsersORM.username == user_update.username))
-        if existing.scalars().first():
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="This username already exists"
+
+async def get_existing_user_ids(
+        user_ids: Iterable[int],
+        session: "AsyncSession",
+) -> Set[int]:
+    query = await session.execute(
+        select(UsersORM.id).where(UsersORM.id.in_(set(user_ids)))
+    )
+    return set(query.scalars().all())
+
+
+async def repair_users_in_batches(
+        values: Dict[str, ColumnElement],
+        session: "AsyncSession",
+        batch_size: int,
+) -> int:
+    """Set users columns to recomputed values, batch_size ids at a time.
+
+    Only rows whose stored value differs are written. Returns the
+    number of users that were fixed.
+    """
+    first_id, last_id = (await session.execute(
+        select(func.min(UsersORM.id), func.max(UsersORM.id))
+    )).one()
+    fixed = 0
+    if first_id is None:
+        return fixed
+    drifted = or_(*(
+        getattr(UsersORM, name).is_distinct_from(value)
+        for name, value in values.items()
+    ))
+    for start in range(first_id, last_id + 1, batch_size):
+        result = await session.execute(
+            update(UsersORM)
+            .where(
+                UsersORM.id.between(start, start + batch_size - 1),
+                drifted,
             )
-        user.username = user_update.username
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        fixed += result.rowcount
+        await session.commit()
+    return fixed
 
-    if user_update.password:
-        user.password = get_password_hash(user_update.password)
 
-    if user_update.birthday:
-        user.birthday = user_update.birthday
+async def recount_comment_counters(
+        session: "AsyncSession",
+        batch_size: int,
+) -> int:
+    """Recompute written and received comment counters of all users"""
+    return await repair_users_in_batches(
+        {
+            'comments_written': (
+                select(func.count())
+                .where(CommentsORM.author_id == UsersORM.id)
+                .scalar_subquery()
+            ),
+            'comments_received': (
+                select(func.count())
+                .where(CommentsORM.user_id == UsersORM.id)
+                .scalar_subquery()
+            ),
+        },
+        session, batch_size,
+    )
 
-    await session.commit()
-    await session.refresh(user)
 
-    return user
+async def recompute_ratings(
+        session: "AsyncSession",
+        batch_size: int,
+) -> int:
+    """Recompute rating, the mean score of received comments, of all users"""
+    scored = (
+        CommentsORM.user_id == UsersORM.id,
+        CommentsORM.score.is_not(None),
+    )
+    rating_sum = (
+        select(func.coalesce(func.sum(CommentsORM.score), 0))
+        .where(*scored)
+        .scalar_subquery()
+    )
+    rating_count = select(func.count()).where(*scored).scalar_subquery()
+    return await repair_users_in_batches(
+        {
+            'rating_sum': rating_sum,
+            'rating_count': rating_count,
+            'rating': (
+                select(func.coalesce(func.avg(CommentsORM.score), 0.0))
+                .where(*scored)
+                .scalar_subquery()
+            ),
+        },
+        session, batch_size,
+    )
@@ -1,14 +1,59 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-import uvicorn
 
 from app.api.routers import main_router
 from app.core.config import settings
+from app.core.db import async_engine, async_read_engine
+from app.core.metrics import MetricsMiddleware, instrument_engine
+from app.core.query_debug import QueryDebugMiddleware, attach_query_debugger
+from app.core.responses import FastJSONResponse
+from app.core.security import hashing_pool
+from app.core.warmup import warm_up
+from app.services.last_login import last_login_buffer
+
+
+def engines() -> dict:
+    """Engines of the application by metrics label, the replica if any"""
+    if async_read_engine is async_engine:
+        return {'primary': async_engine}
+    return {'primary': async_engine, 'replica': async_read_engine}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await warm_up(*engines().values())
+    last_login_buffer.start()
+    yield
+    await last_login_buffer.stop()
+    hashing_pool.shutdown()
+    await async_read_engine.dispose()
+    await async_engine.dispose()
+
 
-app = FastAPI(
-    title=settings.app_title,
-    description=settings.description)
+def create_app() -> FastAPI:
+    app = FastAPI(
+        title=settings.app_title,
+        description=settings.description,
+        default_response_class=FastJSONResponse,
+        lifespan=lifespan)
 
-app.include_router(main_router)
+    app.include_router(main_router)
+    app.add_middleware(MetricsMiddleware)
+    for name, engine in engines().items():
+        instrument_engine(engine, name)
+
+    if settings.db_debug:
+        app.add_middleware(QueryDebugMiddleware)
+        for name, engine in engines().items():
+            attach_query_debugger(engine, name)
+
+    return app
+
+
+app = create_app()
 
 if __name__ == '__main__':
+    import uvicorn
+
     uvicorn.run("app.main:app", reload=True)
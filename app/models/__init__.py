@@ -1,2 +1,2 @@
-from .comments import CommentsORM
+from .comments import CommentsORM, comments_fts
 from .user import UsersORM
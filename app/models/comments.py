@@ -1,6 +1,6 @@
 from datetime import datetime, UTC
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import Float, ForeignKey, Index, Integer, column, table
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.db import Base
@@ -8,6 +8,12 @@ from app.core.db import Base
 
 class CommentsORM(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        Index("ix_comments_author_id_created_at_id",
+              "author_id", "created_at", "id"),
+        Index("ix_comments_user_id_created_at_id",
+              "user_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(
         primary_key=True
@@ -20,13 +26,24 @@ class CommentsORM(Base):
         ForeignKey("users.id", ondelete="CASCADE"),
     )
     created_at: Mapped[datetime] = mapped_column(
-        default=datetime.now(UTC),
+        default=lambda: datetime.now(UTC),
     )
     updated_at: Mapped[datetime] = mapped_column(
-        default=datetime.now(UTC),
-        onupdate=datetime.now(UTC),
+        default=lambda: datetime.now(UTC),
+        onupdate=lambda: datetime.now(UTC),
     )
     is_edited: Mapped[bool] = mapped_column(
         default=False,
         onupdate=True
     )
+    score: Mapped[int | None]
+
+
+# FTS5 index over comments.comment_text, maintained by triggers
+# (see migration 3f6a2c9d41b7). Not part of Base.metadata on purpose:
+# it is a virtual table that create_all/autogenerate must not touch.
+comments_fts = table(
+    "comments_fts",
+    column("rowid", Integer),
+    column("rank", Float),
+)
@@ -21,6 +21,22 @@ class UsersORM(Base):
     rating: Mapped[float] = mapped_column(
         default=0.0,
     )
+    rating_sum: Mapped[int] = mapped_column(
+        default=0,
+        server_default='0',
+    )
+    rating_count: Mapped[int] = mapped_column(
+        default=0,
+        server_default='0',
+    )
+    comments_written: Mapped[int] = mapped_column(
+        default=0,
+        server_default='0',
+    )
+    comments_received: Mapped[int] = mapped_column(
+        default=0,
+        server_default='0',
+    )
     registered_at: Mapped[datetime] = mapped_column(
         default=datetime.now(UTC),
     )
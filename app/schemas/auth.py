@@ -17,7 +17,9 @@ class AuthUser(BaseModel):
     id: int
     username: str
     email: Optional[EmailStr] = None
-    rating: Optional[int] = None
+    rating: Optional[float] = None
+    comments_written: Optional[int] = None
+    comments_received: Optional[int] = None
     is_active: Optional[bool] = None
 
     class Config:
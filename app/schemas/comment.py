@@ -1,6 +1,6 @@
 from datetime import datetime
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import List, Optional
 from fastapi import Form
 
 COMMENT_TEXT_META = {
@@ -10,20 +10,33 @@ COMMENT_TEXT_META = {
 USER_ID_META = {
     "description": "The ID of the user who will receive the comment"
 }
+SCORE_META = {
+    "description": "Optional score of the recipient from 1 to 5",
+    "ge": 1,
+    "le": 5,
+}
 
 
 class CommentCreate(BaseModel):
     comment_text: str = Field(..., **COMMENT_TEXT_META)
     user_id: int = Field(..., **USER_ID_META)
+    score: Optional[int] = Field(None, **SCORE_META)
 
 
 class CommentUpdate(BaseModel):
-    comment_text: str = Field(
-        ...,
+    """Only the fields sent by the client are updated"""
+    comment_text: Optional[str] = Field(
+        None,
         max_length=5000,
         description="Updated comment text",
         title="Updated comment text",
     )
+    score: Optional[int] = Field(
+        None,
+        ge=1,
+        le=5,
+        description="Updated score from 1 to 5, sent empty to clear it",
+    )
 
     @field_validator('comment_text')
     def text_cannot_be_null(cls, value):
@@ -31,6 +44,16 @@ class CommentUpdate(BaseModel):
             raise ValueError('CommentsORM shall not be empty!')
         return value
 
+    @field_validator('score', mode='before')
+    def empty_score_is_null(cls, value):
+        return None if value == '' else value
+
+    @model_validator(mode='after')
+    def something_to_update(self):
+        if not self.model_fields_set:
+            raise ValueError('Nothing to update')
+        return self
+
 
 class CommentResponse(BaseModel):
     id: int
@@ -40,6 +63,7 @@ class CommentResponse(BaseModel):
     created_at: datetime = Field(..., example='2025-04-12T11:00')
     updated_at: Optional[datetime] = Field(..., example='2025-04-12T12:00')
     is_edited: bool
+    score: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -54,6 +78,26 @@ class CommentDB(BaseModel):
         max_length=5000,
         description="Returned comment text"
     )
+    score: Optional[int] = None
 
     class Config:
         from_attributes = True
+
+
+class CommentPage(BaseModel):
+    items: List[CommentDB]
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor of the next page, absent on the last page"
+    )
+
+
+class CommentBulkItem(BaseModel):
+    index: int = Field(..., description="Position of the item in the request")
+    id: Optional[int] = Field(None, description="Created comment id")
+    detail: Optional[str] = Field(None, description="Reason of the failure")
+
+
+class CommentBulkResult(BaseModel):
+    created: int
+    items: List[CommentBulkItem]
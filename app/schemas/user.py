@@ -45,7 +45,9 @@ class UserOut(BaseModel):
     email: EmailStr
     username: str
     birthday: Optional[date]
-    rating: Optional[int]
+    rating: Optional[float]
+    comments_written: int = 0
+    comments_received: int = 0
 
     class Config:
         from_attributes = True
@@ -0,0 +1,55 @@
+import csv
+import io
+from typing import AsyncIterator, Sequence
+
+from pydantic_core import to_json
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.crud.comment import EXPORT_COLUMNS, stream_comments_of_user
+
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+EXPORT_MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def ndjson_chunk(rows: Sequence[Row]) -> bytes:
+    return b''.join(to_json(row._asdict()) + b'\n' for row in rows)
+
+
+def csv_chunk(rows: Sequence[Row], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows(
+        [value.isoformat() if hasattr(value, 'isoformat') else value
+         for value in row]
+        for row in rows
+    )
+    return buffer.getvalue().encode()
+
+
+async def export_comments(
+        user_id: int,
+        export_format: str,
+        session_factory: async_sessionmaker,
+) -> AsyncIterator[bytes]:
+    """Render the user's comments batch by batch.
+
+    The export owns its session: a streamed response outlives the
+    request-scoped session of the endpoint.
+    """
+    if export_format == 'csv':
+        yield csv_chunk([], header=True)
+    async with session_factory() as session:
+        async for rows in stream_comments_of_user(
+                user_id, session, settings.comments_export_batch_size
+        ):
+            if export_format == 'csv':
+                yield csv_chunk(rows)
+            else:
+                yield ndjson_chunk(rows)
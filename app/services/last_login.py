@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from datetime import datetime, UTC
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.db import async_session_factory
+from app.crud.auth import update_last_logins
+
+logger = logging.getLogger(__name__)
+
+
+class LastLoginBuffer:
+    """Collects login times in memory and writes them in batches.
+
+    Logging in only records the time; the buffer is flushed every
+    ``interval`` seconds, as soon as it holds ``max_entries`` users,
+    and once more on shutdown. Only the latest login of a user is kept.
+    """
+
+    def __init__(self, interval: float, max_entries: int):
+        self.interval = interval
+        self.max_entries = max_entries
+        self.pending: Dict[int, datetime] = {}
+        self.flushed = 0
+        self.failed_flushes = 0
+        self.lock = asyncio.Lock()
+        self.task: Optional[asyncio.Task] = None
+        self.flushes: set[asyncio.Task] = set()
+
+    def record(self, user_id: int, logged_in_at: datetime | None = None):
+        self.pending[user_id] = logged_in_at or datetime.now(UTC)
+        if len(self.pending) >= self.max_entries:
+            flush = asyncio.get_running_loop().create_task(self.flush())
+            self.flushes.add(flush)
+            flush.add_done_callback(self.flushes.discard)
+
+    async def flush(self) -> int:
+        async with self.lock:
+            if not self.pending:
+                return 0
+            logins, self.pending = self.pending, {}
+            try:
+                async with async_session_factory() as session:
+                    await update_last_logins(logins, session)
+            except Exception:
+                self.failed_flushes += 1
+                logger.exception('Failed to write %d last logins', len(logins))
+                for user_id, logged_in_at in logins.items():
+                    self.pending.setdefault(user_id, logged_in_at)
+                return 0
+            self.flushed += len(logins)
+            return len(logins)
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        if self.flushes:
+            await asyncio.gather(*self.flushes)
+        await self.flush()
+
+
+last_login_buffer = LastLoginBuffer(
+    interval=settings.last_login_flush_interval_seconds,
+    max_entries=settings.last_login_flush_max_entries,
+)
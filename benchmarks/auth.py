@@ -0,0 +1,75 @@
+"""Microbenchmark of the access token dependency chain.
+
+Resolves get_current_payload -> get_current_auth_user the way FastAPI
+does for every authenticated request, with the token and user caches
+switched on and off.
+
+    python -m benchmarks.auth --iterations 5000
+"""
+import argparse
+import asyncio
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from benchmarks.utils import (
+    configure_environment, migrate, seed, summarize, write_report
+)
+
+VARIANTS = {
+    "no_cache": (0, 0),
+    "user_cache": (0, None),
+    "user_and_token_cache": (None, None),
+}
+
+
+async def measure(iterations: int) -> dict:
+    from app.core.auth.cache import token_cache, user_cache
+    from app.core.auth.dependencies import (
+        get_current_auth_user, get_current_payload
+    )
+    from app.core.db import async_engine, async_session_factory
+    from app.schemas.auth import AuthUser
+    from app.services.auth import create_access_token
+
+    token = await create_access_token(
+        AuthUser(id=1, username="user1", email="user1@example.com")
+    )
+    sizes = token_cache.maxsize, user_cache.maxsize
+    report = {}
+    for name, (token_size, user_size) in VARIANTS.items():
+        token_cache.clear()
+        user_cache.clear()
+        token_cache.maxsize = sizes[0] if token_size is None else token_size
+        user_cache.maxsize = sizes[1] if user_size is None else user_size
+        samples = []
+        async with async_session_factory() as session:
+            for _ in range(iterations):
+                started = perf_counter()
+                payload = await get_current_payload(token)
+                await get_current_auth_user(payload, session)
+                samples.append(perf_counter() - started)
+        report[name] = summarize(samples)
+    token_cache.maxsize, user_cache.maxsize = sizes
+    await async_engine.dispose()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2_000)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "auth.db"
+        configure_environment(path)
+        migrate(path)
+        seed(path, users=10, comments=0, password_hash="x")
+        report = asyncio.run(measure(args.iterations))
+    write_report({"iterations": args.iterations, "variants": report},
+                 args.output)
+
+
+if __name__ == "__main__":
+    main()
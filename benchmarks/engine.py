@@ -0,0 +1,90 @@
+"""Write throughput under concurrency: library engine defaults versus the
+pool and SQLite pragma presets of app.core.db.build_engine.
+
+    python -m benchmarks.engine --concurrency 32 --writes 100
+"""
+import argparse
+import asyncio
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from benchmarks.utils import (
+    configure_environment, database_url, migrate, seed, summarize,
+    write_report
+)
+
+
+async def measure(engine, concurrency: int, writes: int) -> dict:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    from app.crud.comment import create_comment
+    from app.schemas.auth import AuthUser
+    from app.schemas.comment import CommentCreate
+
+    factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+    author = AuthUser(id=1, username="user1")
+    samples = []
+    errors = 0
+
+    async def writer(worker: int):
+        nonlocal errors
+        for i in range(writes):
+            started = perf_counter()
+            try:
+                async with factory() as session:
+                    await create_comment(
+                        CommentCreate(comment_text=f"write {worker} {i}",
+                                      user_id=2),
+                        author, session,
+                    )
+            except Exception:
+                errors += 1
+            samples.append(perf_counter() - started)
+
+    started = perf_counter()
+    await asyncio.gather(*(writer(worker) for worker in range(concurrency)))
+    elapsed = perf_counter() - started
+    await engine.dispose()
+    return {
+        **summarize(samples),
+        "writes_per_second": concurrency * writes / elapsed,
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--writes", type=int, default=50,
+                        help="writes per concurrent worker")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    report = {"concurrency": args.concurrency, "writes": args.writes}
+    with tempfile.TemporaryDirectory() as directory:
+        configure_environment(Path(directory) / "settings.db")
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        from app.core.config import settings
+        from app.core.db import build_engine
+
+        variants = {
+            "library_defaults": lambda url: create_async_engine(url),
+            "presets": lambda url: build_engine(url, settings),
+        }
+        for name, make_engine in variants.items():
+            path = Path(directory) / f"{name}.db"
+            migrate(path)
+            seed(path, users=10, comments=1_000, password_hash="x")
+            report[name] = asyncio.run(measure(
+                make_engine(database_url(path)),
+                args.concurrency, args.writes,
+            ))
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Import time budget of the application module.
+
+Imports app.main in a fresh interpreter under ``python -X importtime``,
+prints the slowest modules and exits non-zero when the cumulative
+import time exceeds the budget or a development-only module is loaded
+by the worker:
+
+    python -m benchmarks.import_time --budget-ms 1500 --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.utils import ROOT, configure_environment
+
+TARGET = "app.main"
+# Only needed by launchers, migrations and tests, never by a worker.
+FORBIDDEN = ("uvicorn", "alembic", "httpx")
+
+
+def import_times(target: str) -> dict[str, tuple[int, int]]:
+    """Self and cumulative import time in microseconds per module"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=ROOT, env=os.environ, capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise SystemExit(result.stderr)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--runs", type=int, default=5,
+                        help="the median of the runs is checked")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        configure_environment(Path(directory) / "import.db")
+        runs = [import_times(TARGET) for _ in range(args.runs)]
+
+    total_ms = statistics.median(run[TARGET][1] for run in runs) / 1000
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1][0],
+                     reverse=True)
+    print(f"{'self ms':>9} {'cumul ms':>9}  module")
+    for name, (self_us, cumulative_us) in slowest[:args.top]:
+        print(f"{self_us / 1000:9.1f} {cumulative_us / 1000:9.1f}  {name}")
+
+    failures = 0
+    loaded = [name for name in FORBIDDEN if name in runs[-1]]
+    if loaded:
+        failures += 1
+        print(f"[FAIL] {TARGET} imports {', '.join(loaded)}")
+    over = total_ms > args.budget_ms
+    failures += over
+    print(f"[{'FAIL' if over else 'ok'}] import {TARGET}: "
+          f"{total_ms:.0f} ms (median of {args.runs}), "
+          f"budget {args.budget_ms:.0f} ms")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
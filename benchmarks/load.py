@@ -0,0 +1,268 @@
+"""In-process load test of every API route.
+
+Seeds a throwaway SQLite database, starts app.main:app behind an httpx
+ASGI transport and drives each route with concurrent requests, one route
+at a time. Throughput and latency percentiles are reported per route as
+JSON, so runs can be diffed:
+
+    python -m benchmarks.load --users 1000 --comments 100000 \
+        --requests 500 --concurrency 32 --output baseline.json
+"""
+import argparse
+import asyncio
+import itertools
+import platform
+import sys
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime, UTC
+from pathlib import Path
+from time import perf_counter
+from typing import Awaitable, Callable
+
+from benchmarks.utils import (
+    WORDS, app_client, bearer, configure_environment, login, migrate,
+    seed, summarize, write_report
+)
+
+PASSWORD = "password"
+
+
+@dataclass
+class Context:
+    """State shared by scenarios: tokens and ids of prepared comments"""
+    client: object
+    users: int
+    access: dict = field(default_factory=dict)
+    refresh: dict = field(default_factory=dict)
+    own_comments: list = field(default_factory=list)
+    disposable_comments: list = field(default_factory=list)
+    counter: itertools.count = field(default_factory=itertools.count)
+
+
+@dataclass
+class Scenario:
+    method: str
+    path: str
+    call: Callable[[Context, int], Awaitable]
+
+    @property
+    def route(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+def sign_up(ctx: Context, i: int):
+    n = next(ctx.counter)
+    return ctx.client.post("/users/sign-up", data={
+        "email": f"load{n}@example.com",
+        "password": PASSWORD,
+        "username": f"load{n:08d}",
+    })
+
+
+def log_in(ctx: Context, i: int):
+    return ctx.client.post("/auth/login", data={
+        "username": f"user{i % ctx.users + 1}", "password": PASSWORD,
+    })
+
+
+def refresh(ctx: Context, i: int):
+    return ctx.client.post("/auth/refresh", headers=ctx.refresh)
+
+
+def me(ctx: Context, i: int):
+    return ctx.client.get("/users/me", headers=ctx.access)
+
+
+def update_me(ctx: Context, i: int):
+    return ctx.client.patch(
+        "/users/1/update", headers=ctx.access,
+        data={"birthday": f"19{i % 100:02d}-01-01"},
+    )
+
+
+def create(ctx: Context, i: int):
+    return ctx.client.post("/comments/", headers=ctx.access, data={
+        "comment_text": f"load {WORDS[i % len(WORDS)]} {i}",
+        "user_id": i % ctx.users + 1,
+    })
+
+
+def create_bulk(ctx: Context, i: int):
+    return ctx.client.post("/comments/bulk", headers=ctx.access, json=[
+        {"comment_text": f"bulk {WORDS[j % len(WORDS)]}",
+         "user_id": j % ctx.users + 1}
+        for j in range(i, i + 20)
+    ])
+
+
+def my_comments(ctx: Context, i: int):
+    return ctx.client.get("/comments/my_comments", headers=ctx.access)
+
+
+def export(ctx: Context, i: int):
+    return ctx.client.get(
+        "/comments/export", headers=ctx.access,
+        params={"format": "csv" if i % 2 else "ndjson"},
+    )
+
+
+def read(ctx: Context, i: int):
+    comment_id = ctx.own_comments[i % len(ctx.own_comments)]
+    return ctx.client.get(f"/comments/{comment_id}", headers=ctx.access)
+
+
+def search(ctx: Context, i: int):
+    return ctx.client.get(
+        "/comments/search/", params={"keyword": WORDS[i % len(WORDS)]}
+    )
+
+
+def update(ctx: Context, i: int):
+    comment_id = ctx.own_comments[i % len(ctx.own_comments)]
+    return ctx.client.patch(
+        f"/comments/{comment_id}", headers=ctx.access,
+        data={"comment_text": f"edited {WORDS[i % len(WORDS)]}"},
+    )
+
+
+def remove(ctx: Context, i: int):
+    comment_id = ctx.disposable_comments.pop()
+    return ctx.client.delete(f"/comments/{comment_id}", headers=ctx.access)
+
+
+def metrics(ctx: Context, i: int):
+    return ctx.client.get("/metrics")
+
+
+SCENARIOS = (
+    Scenario("POST", "/users/sign-up", sign_up),
+    Scenario("POST", "/auth/login", log_in),
+    Scenario("POST", "/auth/refresh", refresh),
+    Scenario("GET", "/users/me", me),
+    Scenario("PATCH", "/users/{user_id}/update", update_me),
+    Scenario("POST", "/comments/", create),
+    Scenario("POST", "/comments/bulk", create_bulk),
+    Scenario("GET", "/comments/my_comments", my_comments),
+    Scenario("GET", "/comments/export", export),
+    Scenario("GET", "/comments/{comment_id}", read),
+    Scenario("GET", "/comments/search/", search),
+    Scenario("PATCH", "/comments/{comment_id}", update),
+    Scenario("DELETE", "/comments/{comment_id}", remove),
+    Scenario("GET", "/metrics", metrics),
+)
+
+
+def uncovered_routes() -> list[str]:
+    from fastapi.routing import APIRoute
+
+    from app.main import app
+
+    covered = {scenario.route for scenario in SCENARIOS}
+    return sorted(
+        f"{method} {route.path}"
+        for route in app.routes if isinstance(route, APIRoute)
+        for method in route.methods
+        if f"{method} {route.path}" not in covered
+    )
+
+
+async def prepare(ctx: Context, requests: int) -> None:
+    tokens = await login(ctx.client, "user1", PASSWORD)
+    ctx.access = bearer(tokens["access_token"])
+    ctx.refresh = bearer(tokens["refresh_token"])
+    for target in (ctx.own_comments, ctx.disposable_comments):
+        while len(target) < requests:
+            response = await ctx.client.post(
+                "/comments/bulk", headers=ctx.access,
+                json=[{"comment_text": "prepared comment", "user_id": 2}]
+                * min(1000, requests - len(target)),
+            )
+            response.raise_for_status()
+            target.extend(item["id"] for item in response.json()["items"])
+
+
+async def drive(ctx: Context, scenario: Scenario, requests: int,
+                concurrency: int) -> dict:
+    samples = []
+    statuses = {}
+    indexes = iter(range(requests))
+
+    async def worker():
+        for i in indexes:
+            started = perf_counter()
+            response = await scenario.call(ctx, i)
+            samples.append(perf_counter() - started)
+            statuses[response.status_code] = (
+                statuses.get(response.status_code, 0) + 1
+            )
+
+    started = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = perf_counter() - started
+    return {
+        **summarize(samples),
+        "throughput_rps": requests / elapsed,
+        "statuses": statuses,
+    }
+
+
+async def run(args) -> dict:
+    report = {}
+    async with app_client() as client:
+        ctx = Context(client=client, users=args.users)
+        await prepare(ctx, args.requests)
+        for scenario in SCENARIOS:
+            if args.only and scenario.route not in args.only:
+                continue
+            report[scenario.route] = await drive(
+                ctx, scenario, args.requests, args.concurrency
+            )
+            print(f"{scenario.route}: "
+                  f"{report[scenario.route]['throughput_rps']:.0f} req/s, "
+                  f"p99 {report[scenario.route]['p99_ms']:.1f} ms",
+                  file=sys.stderr)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--comments", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=200,
+                        help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--only", nargs="*",
+                        help='routes to run, e.g. "GET /users/me"')
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "load.db"
+        configure_environment(path)
+        migrate(path)
+        from app.core.security import get_password_hash
+        seed(path, users=max(args.users, 2), comments=args.comments,
+             password_hash=get_password_hash(PASSWORD))
+        missing = uncovered_routes()
+        if missing:
+            print(f"Routes without a scenario: {', '.join(missing)}",
+                  file=sys.stderr)
+        endpoints = asyncio.run(run(args))
+
+    write_report({
+        "started_at": datetime.now(UTC).isoformat(),
+        "python": platform.python_version(),
+        "config": {
+            "users": args.users,
+            "comments": args.comments,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "uncovered_routes": missing,
+        "endpoints": endpoints,
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Query count budget per endpoint.
+
+Drives every write endpoint and the comment read through the ASGI
+app with warm authentication caches, counts the statements sent to
+the database and exits non-zero when an endpoint exceeds its budget.
+
+    python -m benchmarks.query_counts
+"""
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.utils import (
+    app_client, bearer, configure_environment, login, migrate, seed
+)
+
+# (name, method, url, request kwargs, statement budget); comment urls
+# point at the comment made by the first request.
+BUDGETS = (
+    ("create comment", "POST", "/comments/",
+     {"data": {"comment_text": "budget check", "user_id": 2}}, 1),
+    ("read comment", "GET", "/comments/{comment_id}", {}, 1),
+    ("update comment", "PATCH", "/comments/{comment_id}",
+     {"data": {"comment_text": "edited"}}, 1),
+    ("delete comment", "DELETE", "/comments/{comment_id}", {}, 1),
+    ("bulk comments", "POST", "/comments/bulk",
+     {"json": [{"comment_text": "bulk", "user_id": 2}] * 10}, 2),
+    ("sign up", "POST", "/users/sign-up",
+     {"data": {"email": "new@example.com", "password": "secret",
+               "username": "newbie"}}, 1),
+    ("update user", "PATCH", "/users/1/update",
+     {"data": {"birthday": "1990-01-01"}}, 1),
+    ("current user", "GET", "/users/me", {}, 0),
+)
+
+
+async def count_queries() -> int:
+    from sqlalchemy import event
+
+    from app.core.db import async_engine
+
+    statements = []
+    event.listen(
+        async_engine.sync_engine, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    failures = 0
+    async with app_client() as client:
+        tokens = await login(client, "user1", "password")
+        headers = bearer(tokens["access_token"])
+        await client.get("/users/me", headers=headers)
+        created = {}
+        for name, method, url, kwargs, budget in BUDGETS:
+            statements.clear()
+            response = await client.request(
+                method, url.format(**created), headers=headers, **kwargs
+            )
+            if name == "create comment":
+                created["comment_id"] = response.json().get("id")
+            over = len(statements) > budget or response.is_error
+            failures += over
+            print(f"[{'FAIL' if over else 'ok'}] {name}: "
+                  f"{len(statements)} statement(s), budget {budget}, "
+                  f"HTTP {response.status_code}")
+            for statement in statements:
+                print(f"    {' '.join(statement.split())[:120]}")
+            if not response.is_error:
+                await client.get("/users/me", headers=headers)
+    return failures
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "counts.db"
+        configure_environment(path)
+        migrate(path)
+        from app.core.security import get_password_hash
+        seed(path, users=10, comments=100,
+             password_hash=get_password_hash("password"))
+        failures = asyncio.run(count_queries())
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""Query plan regression check for the CRUD layer.
+
+Runs every CRUD query against a migrated, seeded database, records the
+SQL actually sent to SQLite and fails if ``EXPLAIN QUERY PLAN`` shows a
+full table scan for any of them.
+
+    python -m benchmarks.query_plans
+"""
+import asyncio
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, UTC
+from pathlib import Path
+
+from benchmarks.utils import configure_environment, migrate, seed
+
+# Child-side lookups SQLite performs for ON DELETE CASCADE foreign keys.
+FOREIGN_KEY_LOOKUPS = (
+    ("SELECT 1 FROM comments WHERE author_id = ?", (1,)),
+    ("SELECT 1 FROM comments WHERE user_id = ?", (1,)),
+)
+
+
+async def capture_statements() -> list[tuple[str, str, tuple]]:
+    from fastapi import Request
+    from sqlalchemy import event
+
+    from app.api.endpoints.validators import comment_access_error
+    from app.core.auth.dependencies import get_user_by_sub
+    from app.core.db import async_engine, async_session_factory
+    from app.crud import auth, comment, user
+    from app.schemas.auth import AuthUser, PayloadSchema
+    from app.schemas.comment import CommentCreate, CommentUpdate
+    from app.schemas.user import UserCreate, UserUpdate
+
+    captured = []
+    current = {"name": None}
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            captured.append((current["name"], statement, tuple(parameters)))
+
+    author = AuthUser(id=1, username="user1", email="user1@example.com")
+    payload = PayloadSchema(type="access", sub="1", iat=0, jti="x")
+
+    async def run(name, coroutine_function):
+        current["name"] = name
+        async with async_session_factory() as session:
+            try:
+                await coroutine_function(session)
+            except Exception as error:  # HTTP errors are fine here
+                if not hasattr(error, "status_code"):
+                    raise
+
+    request = Request({"type": "http", "client": ("127.0.0.1", 0)})
+    await run("validate_auth_user", lambda s: auth.validate_auth_user(
+        "user1", "password", s, request))
+    await run("update_last_logins", lambda s: auth.update_last_logins(
+        {1: datetime.now(UTC)}, s))
+    await run("get_user_by_sub", lambda s: get_user_by_sub(payload, s))
+    await run("get_existing_user_ids", lambda s: user.get_existing_user_ids(
+        [2, 3, 404], s))
+    await run("create_user", lambda s: user.create_user(
+        UserCreate(email="new@example.com", password="secret",
+                   username="newbie"), s))
+    await run("update_user", lambda s: user.update_user(
+        1, UserUpdate(email="other@example.com", username="other"),
+        author, s))
+    await run("create_comment", lambda s: comment.create_comment(
+        CommentCreate(comment_text="fresh words", user_id=2), author, s))
+    await run("get_comment_by_id", lambda s: comment.get_comment_by_id(
+        1, author, s))
+    await run("comment_access_error", lambda s: comment_access_error(1, s))
+    await run("create_comments_bulk", lambda s: comment.create_comments_bulk(
+        [CommentCreate(comment_text="bulk words", user_id=2)] * 3,
+        author, {2}, s))
+
+    async def paginated(session):
+        _, cursor = await comment.get_comment_by_user(author, session, 2)
+        await comment.get_comment_by_user(author, session, 2, cursor)
+    await run("get_comment_by_user", paginated)
+
+    async def searched(session):
+        _, cursor = await comment.search_comments_by_keyword(
+            "helpful", session, 2)
+        await comment.search_comments_by_keyword(
+            "helpful", session, 2, cursor)
+    await run("search_comments_by_keyword", searched)
+
+    async def exported(session):
+        async for _ in comment.stream_comments_of_user(1, session, 100):
+            pass
+    await run("stream_comments_of_user", exported)
+
+    await run("update_comment", lambda s: comment.update_comment(
+        1, CommentUpdate(comment_text="edited"), author, s))
+    await run("delete_comment", lambda s: comment.delete_comment(
+        1, author, s))
+
+    await async_engine.dispose()
+    return captured
+
+
+def full_scans(connection: sqlite3.Connection, statement: str, parameters: tuple):
+    plan = connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return [
+        detail for _, _, _, detail in plan
+        if detail.startswith("SCAN ") and "VIRTUAL TABLE" not in detail
+    ]
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "plans.db"
+        configure_environment(path)
+        migrate(path)
+        from app.core.security import get_password_hash
+        seed(path, users=50, comments=2_000,
+             password_hash=get_password_hash("password"))
+        statements = asyncio.run(capture_statements())
+        statements += [("foreign key", *lookup) for lookup in FOREIGN_KEY_LOOKUPS]
+
+        connection = sqlite3.connect(path)
+        failures = 0
+        for name, statement, parameters in statements:
+            if not statement.lstrip().upper().startswith(
+                    ("SELECT", "UPDATE", "DELETE", "INSERT")):
+                continue
+            scans = full_scans(connection, statement, parameters)
+            status = "FULL SCAN" if scans else "ok"
+            print(f"[{status}] {name}: {' '.join(statement.split())}")
+            for detail in scans:
+                print(f"    {detail}")
+            failures += bool(scans)
+        connection.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Search latency against table size: FTS5 index versus LIKE scan.
+
+    python -m benchmarks.search --sizes 1000 10000 100000 --output search.json
+"""
+import argparse
+import asyncio
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from benchmarks.utils import (
+    configure_environment, database_url, migrate, seed, summarize,
+    write_report
+)
+
+KEYWORDS = ("helpful", "quick", "service", "honest review", "comm")
+
+
+async def measure(path: Path, repeat: int, limit: int) -> dict:
+    from fastapi import HTTPException
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    from app.crud.comment import search_comments_by_keyword
+    from app.models import CommentsORM
+
+    engine = create_async_engine(database_url(path))
+    results = {"fts": [], "like": []}
+    async with AsyncSession(engine) as session:
+        for _ in range(repeat):
+            for keyword in KEYWORDS:
+                started = perf_counter()
+                try:
+                    await search_comments_by_keyword(keyword, session, limit)
+                except HTTPException:
+                    pass
+                results["fts"].append(perf_counter() - started)
+
+                started = perf_counter()
+                query = (
+                    select(CommentsORM)
+                    .where(CommentsORM.comment_text.like(f"%{keyword}%"))
+                    .order_by(CommentsORM.created_at.desc(),
+                              CommentsORM.id.desc())
+                    .limit(limit + 1)
+                )
+                (await session.execute(query)).scalars().all()
+                results["like"].append(perf_counter() - started)
+    await engine.dispose()
+    return {name: summarize(samples) for name, samples in results.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    report = {"keywords": KEYWORDS, "limit": args.limit, "sizes": {}}
+    with tempfile.TemporaryDirectory() as directory:
+        configure_environment(Path(directory) / "settings.db")
+        for size in args.sizes:
+            path = Path(directory) / f"search_{size}.db"
+            migrate(path)
+            seed(path, users=max(10, size // 100), comments=size,
+                 password_hash="x")
+            report["sizes"][size] = asyncio.run(
+                measure(path, args.repeat, args.limit)
+            )
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Microbenchmark of comment list serialization.
+
+Compares the FastAPI response_model path (schema instance, validation
+against response_model, jsonable_encoder, json.dumps) with
+app.core.responses.model_response on pages of ORM objects:
+
+    python -m benchmarks.serialization --sizes 1000 10000 --repeat 20
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+from datetime import datetime, UTC
+from pathlib import Path
+from time import perf_counter
+
+from benchmarks.utils import WORDS, configure_environment, summarize, write_report
+
+
+def build_comments(size: int) -> list:
+    from app.models import CommentsORM
+
+    now = datetime.now(UTC)
+    return [
+        CommentsORM(
+            id=i,
+            author_id=i % 97 + 1,
+            user_id=i % 89 + 1,
+            comment_text=" ".join(WORDS[i % len(WORDS):][:12]),
+            created_at=now,
+            updated_at=now,
+            is_edited=False,
+        )
+        for i in range(1, size + 1)
+    ]
+
+
+async def measure(sizes: list[int], repeat: int) -> dict:
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_model_field
+
+    from app.core.responses import model_response
+    from app.schemas.comment import CommentPage
+
+    field = create_model_field(
+        "Response_get_my_comments", CommentPage, mode="serialization"
+    )
+
+    async def response_model_path(comments: list) -> bytes:
+        content = await serialize_response(
+            field=field,
+            response_content=CommentPage(items=comments, next_cursor=None),
+        )
+        return JSONResponse(content).body
+
+    async def model_response_path(comments: list) -> bytes:
+        return model_response(
+            CommentPage, {"items": comments, "next_cursor": None}
+        ).body
+
+    report = {}
+    for size in sizes:
+        comments = build_comments(size)
+        reference = await response_model_path(comments)
+        if json.loads(await model_response_path(comments)) != json.loads(reference):
+            raise SystemExit(f"Serialized bodies differ for {size} rows")
+        report[size] = {}
+        for name, render in (
+            ("response_model", response_model_path),
+            ("model_response", model_response_path),
+        ):
+            samples = []
+            for _ in range(repeat):
+                started = perf_counter()
+                await render(comments)
+                samples.append(perf_counter() - started)
+            report[size][name] = summarize(samples)
+        report[size]["speedup"] = (
+            report[size]["response_model"]["mean_ms"]
+            / report[size]["model_response"]["mean_ms"]
+        )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        configure_environment(Path(directory) / "serialization.db")
+        report = asyncio.run(measure(args.sizes, args.repeat))
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Throughput of the production server against the dev launcher.
+
+Seeds a throwaway SQLite database, starts the application over real
+sockets once as the development launcher does (uvicorn with the
+reloader, one process) and once through ``python -m app serve``, and
+drives both with the same concurrent read traffic:
+
+    python -m benchmarks.serve --duration 20 --concurrency 64 --workers 4
+"""
+import argparse
+import asyncio
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from time import perf_counter
+
+import httpx
+
+from benchmarks.utils import (
+    ROOT, WORDS, bearer, configure_environment, migrate, seed, summarize,
+    write_report
+)
+
+PASSWORD = "password"
+
+
+def launchers(port: int, workers: int | None) -> dict[str, list[str]]:
+    serve = [sys.executable, "-m", "app", "serve", "--port", str(port),
+             "--no-access-log"]
+    if workers:
+        serve += ["--workers", str(workers)]
+    return {
+        # What `python -m app.main` runs, on a free port.
+        "dev": [sys.executable, "-m", "uvicorn", "app.main:app",
+                "--reload", "--port", str(port)],
+        "serve": serve,
+    }
+
+
+def wait_until_ready(base_url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/metrics").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"Server at {base_url} did not start")
+
+
+async def drive(base_url: str, duration: float, concurrency: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency,
+                          max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits,
+                                 timeout=30) as client:
+        response = await client.post("/auth/login", data={
+            "username": "user1", "password": PASSWORD,
+        })
+        response.raise_for_status()
+        headers = bearer(response.json()["access_token"])
+        requests = (
+            lambda i: client.get("/users/me", headers=headers),
+            lambda i: client.get("/comments/my_comments", headers=headers),
+            lambda i: client.get("/comments/search/",
+                                 params={"keyword": WORDS[i % len(WORDS)]}),
+        )
+        samples = []
+        statuses = {}
+        deadline = perf_counter() + duration
+
+        async def worker(offset: int):
+            i = offset
+            while perf_counter() < deadline:
+                started = perf_counter()
+                response = await requests[i % len(requests)](i)
+                samples.append(perf_counter() - started)
+                statuses[response.status_code] = (
+                    statuses.get(response.status_code, 0) + 1
+                )
+                i += concurrency
+
+        started = perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = perf_counter() - started
+    return {
+        **summarize(samples),
+        "throughput_rps": len(samples) / elapsed,
+        "statuses": statuses,
+    }
+
+
+def run(command: list[str], base_url: str, args) -> dict:
+    server = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(base_url)
+        return asyncio.run(drive(base_url, args.duration, args.concurrency))
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--comments", type=int, default=10_000)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int,
+                        help="serve workers, more than one needs "
+                             "TOKEN_STORAGE_URL")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    report = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "serve.db"
+        configure_environment(path)
+        migrate(path)
+        from app.core.security import get_password_hash
+        seed(path, users=args.users, comments=args.comments,
+             password_hash=get_password_hash(PASSWORD))
+        base_url = f"http://127.0.0.1:{args.port}"
+        for name, command in launchers(args.port, args.workers).items():
+            report[name] = run(command, base_url, args)
+            print(f"{name}: {report[name]['throughput_rps']:.0f} req/s, "
+                  f"p99 {report[name]['p99_ms']:.1f} ms", file=sys.stderr)
+
+    report["speedup"] = (
+        report["serve"]["throughput_rps"] / report["dev"]["throughput_rps"]
+    )
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
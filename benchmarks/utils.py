@@ -0,0 +1,153 @@
+"""Helpers shared by the benchmark scripts.
+
+Benchmarks run against throwaway SQLite databases created with the
+project migrations, so the numbers reflect the real schema and indexes.
+"""
+import json
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+WORDS = (
+    "time person year way day thing man world life hand part child eye "
+    "woman place work week case point government company number group "
+    "problem fact good new first last long great little own other old "
+    "right big high different small large next early young important few "
+    "public bad same able service comment user answer question review "
+    "helpful friendly quick slow polite rude reliable honest careful"
+).split()
+
+
+def database_url(path: Path) -> str:
+    return f"sqlite+aiosqlite:///{path}"
+
+
+def configure_environment(path: Path) -> str:
+    """Point the application settings at ``path`` before app is imported"""
+    url = database_url(path)
+    os.environ["DATABASE_URL"] = url
+    os.environ.setdefault("SECRET", "benchmark-secret-key-of-32-bytes!")
+    # Every benchmark request comes from the same client address.
+    os.environ.setdefault("LOGIN_CLIENT_BURST", "1000000")
+    return url
+
+
+def migrate(path: Path) -> None:
+    """Create the schema in ``path`` with alembic migrations.
+
+    Runs in a subprocess because migrations/env.py reads the already
+    imported settings object.
+    """
+    env = dict(os.environ, DATABASE_URL=database_url(path))
+    env.setdefault("SECRET", "benchmark-secret-key-of-32-bytes!")
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=ROOT, env=env, check=True, capture_output=True,
+    )
+
+
+@asynccontextmanager
+async def app_client():
+    """HTTP client bound to app.main:app through an in-process ASGI transport.
+
+    The database and settings must be configured before the call.
+    """
+    import httpx
+
+    from app.core.db import async_engine
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+                transport=transport, base_url="http://benchmark"
+        ) as client:
+            yield client
+    await async_engine.dispose()
+
+
+async def login(client, username: str, password: str) -> dict:
+    """Access and refresh tokens of a freshly logged in user"""
+    response = await client.post(
+        "/auth/login", data={"username": username, "password": password}
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def random_text(rng: random.Random, min_words: int = 5, max_words: int = 30) -> str:
+    return " ".join(rng.choices(WORDS, k=rng.randint(min_words, max_words)))
+
+
+def seed(
+        path: Path,
+        users: int,
+        comments: int,
+        password_hash: str,
+        seed_value: int = 0,
+) -> None:
+    """Bulk insert users and comments directly with sqlite3"""
+    rng = random.Random(seed_value)
+    now = datetime.now(UTC).replace(tzinfo=None)
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.executemany(
+            "INSERT INTO users (id, username, email, password, rating, "
+            "registered_at, is_active, is_superuser) "
+            "VALUES (?, ?, ?, ?, 0.0, ?, 1, 0)",
+            (
+                (i, f"user{i}", f"user{i}@example.com", password_hash, now)
+                for i in range(1, users + 1)
+            ),
+        )
+        connection.executemany(
+            "INSERT INTO comments (comment_text, user_id, author_id, "
+            "created_at, updated_at, is_edited) VALUES (?, ?, ?, ?, ?, 0)",
+            (
+                (
+                    random_text(rng),
+                    rng.randint(1, users),
+                    rng.randint(1, users),
+                    now - timedelta(seconds=comments - i),
+                    now - timedelta(seconds=comments - i),
+                )
+                for i in range(comments)
+            ),
+        )
+    connection.close()
+
+
+def summarize(samples: list[float]) -> dict:
+    """Latency percentiles in milliseconds"""
+    ordered = sorted(samples)
+
+    def percentile(q: float) -> float:
+        index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+        return ordered[index] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+    }
+
+
+def write_report(report: dict, output: str | None) -> None:
+    text = json.dumps(report, indent=2, default=str)
+    if output:
+        Path(output).write_text(text)
+    print(text)
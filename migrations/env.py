@@ -20,6 +20,13 @@ config.set_main_option("sqlalchemy.url", sync_url)
 target_metadata = Base.metadata
 
 
+def include_name(name, type_, parent_names):
+    """Skip the FTS5 virtual table and its shadow tables"""
+    if type_ == "table" and name.startswith("comments_fts"):
+        return False
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -38,6 +45,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -59,7 +67,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
         )
 
         with context.begin_transaction():
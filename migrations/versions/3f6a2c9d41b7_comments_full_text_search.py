@@ -0,0 +1,57 @@
+"""Comments full text search
+
+Revision ID: 3f6a2c9d41b7
+Revises: 8b1cad455975
+Create Date: 2026-10-18 12:40:12.418306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6a2c9d41b7'
+down_revision: Union[str, None] = '8b1cad455975'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "CREATE VIRTUAL TABLE comments_fts USING fts5("
+        "comment_text, content='comments', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "CREATE TRIGGER comments_fts_ai AFTER INSERT ON comments BEGIN "
+        "INSERT INTO comments_fts(rowid, comment_text) "
+        "VALUES (new.id, new.comment_text); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER comments_fts_ad AFTER DELETE ON comments BEGIN "
+        "INSERT INTO comments_fts(comments_fts, rowid, comment_text) "
+        "VALUES ('delete', old.id, old.comment_text); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER comments_fts_au AFTER UPDATE OF comment_text "
+        "ON comments BEGIN "
+        "INSERT INTO comments_fts(comments_fts, rowid, comment_text) "
+        "VALUES ('delete', old.id, old.comment_text); "
+        "INSERT INTO comments_fts(rowid, comment_text) "
+        "VALUES (new.id, new.comment_text); "
+        "END"
+    )
+    op.execute("INSERT INTO comments_fts(comments_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER comments_fts_au")
+    op.execute("DROP TRIGGER comments_fts_ad")
+    op.execute("DROP TRIGGER comments_fts_ai")
+    op.execute("DROP TABLE comments_fts")
@@ -0,0 +1,72 @@
+"""Users comment counters
+
+Revision ID: c5d8e2a4f916
+Revises: a71e5d0c83f2
+Create Date: 2026-10-18 13:20:31.557014
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d8e2a4f916'
+down_revision: Union[str, None] = 'a71e5d0c83f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('comments_written', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('comments_received', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        "UPDATE users SET "
+        "comments_written = (SELECT count(*) FROM comments "
+        "WHERE comments.author_id = users.id), "
+        "comments_received = (SELECT count(*) FROM comments "
+        "WHERE comments.user_id = users.id)"
+    )
+    # Triggers fire for every row, so ON DELETE CASCADE of a user
+    # keeps the counters of the other side of the comments right too.
+    op.execute(
+        "CREATE TRIGGER users_counters_ai AFTER INSERT ON comments BEGIN "
+        "UPDATE users SET comments_written = comments_written + 1 "
+        "WHERE id = new.author_id; "
+        "UPDATE users SET comments_received = comments_received + 1 "
+        "WHERE id = new.user_id; "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER users_counters_ad AFTER DELETE ON comments BEGIN "
+        "UPDATE users SET comments_written = comments_written - 1 "
+        "WHERE id = old.author_id; "
+        "UPDATE users SET comments_received = comments_received - 1 "
+        "WHERE id = old.user_id; "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER users_counters_au AFTER UPDATE OF author_id, user_id "
+        "ON comments BEGIN "
+        "UPDATE users SET comments_written = comments_written - 1 "
+        "WHERE id = old.author_id; "
+        "UPDATE users SET comments_received = comments_received - 1 "
+        "WHERE id = old.user_id; "
+        "UPDATE users SET comments_written = comments_written + 1 "
+        "WHERE id = new.author_id; "
+        "UPDATE users SET comments_received = comments_received + 1 "
+        "WHERE id = new.user_id; "
+        "END"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER users_counters_au")
+    op.execute("DROP TRIGGER users_counters_ad")
+    op.execute("DROP TRIGGER users_counters_ai")
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('comments_received')
+        batch_op.drop_column('comments_written')
@@ -0,0 +1,74 @@
+"""Comments score and incremental users rating
+
+Revision ID: d9b3f17a6c52
+Revises: c5d8e2a4f916
+Create Date: 2026-10-18 13:41:07.204851
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9b3f17a6c52'
+down_revision: Union[str, None] = 'c5d8e2a4f916'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# users.rating is the mean score of the comments a user received.
+# SET expressions see the row as it was before the UPDATE, so the
+# new mean is computed from the old sum and count in the same step.
+ADD_SCORE = (
+    "UPDATE users SET "
+    "rating_sum = rating_sum + {row}.score, "
+    "rating_count = rating_count + 1, "
+    "rating = (rating_sum + {row}.score) * 1.0 / (rating_count + 1) "
+    "WHERE id = {row}.user_id AND {row}.score IS NOT NULL; "
+)
+REMOVE_SCORE = (
+    "UPDATE users SET "
+    "rating_sum = rating_sum - {row}.score, "
+    "rating_count = rating_count - 1, "
+    "rating = CASE WHEN rating_count > 1 "
+    "THEN (rating_sum - {row}.score) * 1.0 / (rating_count - 1) "
+    "ELSE 0 END "
+    "WHERE id = {row}.user_id AND {row}.score IS NOT NULL; "
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('comments', sa.Column('score', sa.Integer(), nullable=True))
+    op.add_column('users', sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute("UPDATE users SET rating = 0")
+    op.execute(
+        "CREATE TRIGGER users_rating_ai AFTER INSERT ON comments BEGIN "
+        + ADD_SCORE.format(row='new')
+        + "END"
+    )
+    op.execute(
+        "CREATE TRIGGER users_rating_ad AFTER DELETE ON comments BEGIN "
+        + REMOVE_SCORE.format(row='old')
+        + "END"
+    )
+    op.execute(
+        "CREATE TRIGGER users_rating_au AFTER UPDATE OF score, user_id "
+        "ON comments BEGIN "
+        + REMOVE_SCORE.format(row='old')
+        + ADD_SCORE.format(row='new')
+        + "END"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER users_rating_au")
+    op.execute("DROP TRIGGER users_rating_ad")
+    op.execute("DROP TRIGGER users_rating_ai")
+    # Not batch operations: recreating comments would drop its triggers.
+    op.execute("ALTER TABLE users DROP COLUMN rating_count")
+    op.execute("ALTER TABLE users DROP COLUMN rating_sum")
+    op.execute("ALTER TABLE comments DROP COLUMN score")